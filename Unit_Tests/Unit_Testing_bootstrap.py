@@ -0,0 +1,74 @@
+import sys
+import os
+current_directory = os.getcwd()
+main_directory_path = os.path.abspath(os.path.join(current_directory, '..'))
+sys.path.insert(0, main_directory_path)
+
+import unittest
+import numpy as np
+from bootstrap import *
+from bootstrap import _estimate_from_counts
+from parameter_estimation import estimate_parameters
+
+
+class TestBootstrap(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.sample_data = rng.binomial(20, 0.3, 10000)
+
+    def test_bootstrap_distribution_reproducible(self):
+        estimates = bootstrap_distribution(self.sample_data, n_resamples=250, batch_size=100, seed=42)
+        self.assertEqual(len(estimates), 250)
+        repeated = bootstrap_distribution(self.sample_data, n_resamples=250, batch_size=100, seed=42)
+        self.assertTrue(np.array_equal(estimates, repeated))
+
+    def test_bootstrap_distribution_parallel_matches_serial(self):
+        serial = bootstrap_distribution(self.sample_data, n_resamples=300, batch_size=100, seed=7)
+        parallel = bootstrap_distribution(self.sample_data, n_resamples=300, batch_size=100, n_workers=2, seed=7)
+        self.assertTrue(np.array_equal(serial, parallel))
+
+    def test_bootstrap_confidence_interval_percentile(self):
+        lower_bound, upper_bound = bootstrap_confidence_interval(self.sample_data, seed=1)
+        self.assertLess(lower_bound, 0.3)
+        self.assertGreater(upper_bound, 0.3)
+
+    def test_bootstrap_confidence_interval_bca(self):
+        lower_bound, upper_bound = bootstrap_confidence_interval(self.sample_data, estimator='mle', method='bca',
+                                                                 seed=1)
+        p_estimate = np.mean(self.sample_data) / np.max(self.sample_data)
+        self.assertLess(lower_bound, p_estimate)
+        self.assertGreater(upper_bound, p_estimate)
+
+    def test_bootstrap_confidence_interval_generator_input(self):
+        expected = bootstrap_confidence_interval(self.sample_data, method='bca', seed=3)
+        interval = bootstrap_confidence_interval((int(x) for x in self.sample_data), method='bca', seed=3)
+        self.assertEqual(interval, expected)
+
+    def test_moments_estimate_matches_estimate_parameters(self):
+        sample_data = [100] * 99 + [101]
+        n_estimate, p_estimate = estimate_parameters(sample_data)
+        counts = np.array([[99, 1]])
+        self.assertAlmostEqual(_estimate_from_counts([100, 101], counts, 'p', 'moments')[0], p_estimate)
+        self.assertEqual(_estimate_from_counts([100, 101], counts, 'n', 'moments')[0], n_estimate)
+
+    def test_bootstrap_confidence_interval_n(self):
+        lower_bound, upper_bound = bootstrap_confidence_interval(self.sample_data, parameter='n', seed=1)
+        self.assertLessEqual(lower_bound, 20)
+        self.assertGreaterEqual(upper_bound, 20)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            bootstrap_confidence_interval(self.sample_data, method='invalid')
+        with self.assertRaises(ValueError):
+            bootstrap_confidence_interval(self.sample_data, parameter='q')
+        with self.assertRaises(ValueError):
+            bootstrap_confidence_interval([])
+
+
+def main():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False, verbosity=3)
+
+
+if __name__ == "__main__":
+    main()
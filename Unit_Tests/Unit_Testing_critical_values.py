@@ -0,0 +1,65 @@
+import sys
+import os
+current_directory = os.getcwd()
+main_directory_path = os.path.abspath(os.path.join(current_directory, '..'))
+sys.path.insert(0, main_directory_path)
+
+import unittest
+import numpy as np
+from scipy import stats
+from critical_values import *
+
+
+class TestCriticalValues(unittest.TestCase):
+
+    def test_norm_ppf(self):
+        self.assertAlmostEqual(norm_ppf(0.975), stats.norm.ppf(0.975), places=12)
+        self.assertAlmostEqual(norm_ppf(0.123), stats.norm.ppf(0.123), places=12)
+        self.assertTrue(np.allclose(norm_ppf([0.1, 0.5, 0.9]), stats.norm.ppf([0.1, 0.5, 0.9])))
+
+    def test_norm_ppf_without_scipy(self):
+        import critical_values
+        for q in [1e-300, 1e-20, 0.01, 0.3, 0.5, 0.77, 0.999999]:
+            expected = stats.norm.ppf(q)
+            self.assertAlmostEqual(critical_values._norm_ppf_scalar(q), expected,
+                                   delta=1e-13 * max(1, abs(expected)))
+        self.assertEqual(norm_ppf(0.0), -np.inf)
+        self.assertTrue(np.isnan(norm_ppf(1.5)))
+
+    def test_norm_cdf_sf_isf(self):
+        for x in [-30.0, -2.5, 0.0, 1.3, 8.0, 30.0]:
+            self.assertAlmostEqual(norm_cdf(x) / stats.norm.cdf(x), 1.0, places=12)
+            self.assertAlmostEqual(norm_sf(x) / stats.norm.sf(x), 1.0, places=12)
+        self.assertGreater(norm_sf(30.0), 0.0)
+        self.assertTrue(np.allclose(norm_sf(np.array([1.0, 9.0])), stats.norm.sf([1.0, 9.0]), rtol=1e-12))
+        self.assertAlmostEqual(norm_isf(1e-20), stats.norm.isf(1e-20), places=10)
+        self.assertTrue(np.allclose(norm_isf([0.05, 1e-10]), stats.norm.isf([0.05, 1e-10])))
+
+    def test_t_ppf(self):
+        self.assertAlmostEqual(t_ppf(0.05, 10), stats.t.ppf(0.05, 10), places=12)
+        self.assertAlmostEqual(t_ppf(0.05, 1000), stats.t.ppf(0.05, 1000), places=12)
+        self.assertTrue(np.allclose(t_ppf(0.975, [5, 50]), stats.t.ppf(0.975, [5, 50])))
+
+    def test_beta_ppf(self):
+        self.assertAlmostEqual(beta_ppf(0.025, 72, 29), stats.beta.ppf(0.025, 72, 29), places=12)
+        self.assertTrue(np.isnan(beta_ppf(0.025, 0, 5)))
+
+    def test_chi2_sf(self):
+        self.assertAlmostEqual(chi2_sf(3.0, 3), stats.chi2.sf(3.0, 3), places=12)
+        self.assertGreater(chi2_sf(400.0, 3), 0.0)
+        self.assertTrue(np.isnan(chi2_sf(np.nan, 3)))
+
+    def test_cache_is_bounded(self):
+        import critical_values
+        clear_cache()
+        for i in range(1, CACHE_SIZE + 10):
+            norm_ppf(i / (CACHE_SIZE + 20))
+        self.assertEqual(critical_values._norm_ppf_cached.cache_info().currsize, CACHE_SIZE)
+
+
+def main():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False, verbosity=3)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,9 @@ sys.path.insert(0, main_directory_path)
 
 import unittest
 import numpy as np
+from scipy import stats
 from hypothesis_testing import *
+from hypothesis_testing import _harmonic_number
 
 
 class TestHypothesisTesting(unittest.TestCase):
@@ -43,6 +45,13 @@ class TestHypothesisTesting(unittest.TestCase):
         with self.assertRaises(ValueError):
             proportion_z_test(50, 100, 0, 0)
 
+    def test_proportion_z_test_tail_precision(self):
+        p_value = proportion_z_test(900, 1000, 500, 1000, alternative='greater')
+        self.assertGreater(p_value, 0.0)
+        self.assertAlmostEqual(p_value / stats.norm.sf(19.518001458970662), 1.0, places=10)
+        self.assertAlmostEqual(continuity_corrected_proportion_z_test(50, 100, 40, 100),
+                               2 * stats.norm.sf(0.1 / np.sqrt(0.45 * 0.55 * 0.02)), places=12)
+
     def test_power_analysis_binomial_proportions(self):
         sample_size = power_analysis_binomial_proportions(0.5, 0.4, 0.05, 0.8)
         self.assertEqual(sample_size, 389)
@@ -56,6 +65,84 @@ class TestHypothesisTesting(unittest.TestCase):
         with self.assertRaises(ValueError):
             power_analysis_binomial_proportions(0.5, 0.4, 0.05, 0.8, alternative='invalid')
 
+    def test_power_analysis_binomial_proportions_batch(self):
+        p1 = np.array([0.5, 0.1, 0.001])
+        p2 = np.array([0.4, 0.05, 0.0005])
+        sample_sizes = power_analysis_binomial_proportions_batch(p1[:, None], p2[None, :], 0.05, 0.8)
+        self.assertEqual(sample_sizes.shape, (3, 3))
+        for i in range(3):
+            for j in range(3):
+                self.assertEqual(sample_sizes[i, j], power_analysis_binomial_proportions(p1[i], p2[j], 0.05, 0.8))
+        self.assertTrue(np.isinf(power_analysis_binomial_proportions_batch(0.5, 0.5)))
+
+        with self.assertRaises(ValueError):
+            power_analysis_binomial_proportions_batch([0.5, 1.5], 0.4)
+
+    def test_power_and_minimum_detectable_effect(self):
+        self.assertAlmostEqual(power_binomial_proportions(0.5, 0.4, 388.5195468), 0.8, places=6)
+        self.assertGreaterEqual(power_binomial_proportions(0.5, 0.4, 389), 0.8)
+
+        # One-sided power follows the direction of the alternative.
+        self.assertGreater(power_binomial_proportions(0.5, 0.4, 389, alternative='greater'), 0.8)
+        self.assertLessEqual(power_binomial_proportions(0.5, 0.4, 389, alternative='less'), 0.05)
+        self.assertGreater(power_binomial_proportions(0.4, 0.5, 389, alternative='less'), 0.8)
+
+        effect = minimum_detectable_effect_binomial_proportions(0.5, 389)
+        self.assertAlmostEqual(power_binomial_proportions(0.5, 0.5 - effect, 389), 0.8, places=8)
+        self.assertLess(effect, 0.1)
+
+        effects = minimum_detectable_effect_binomial_proportions([0.0, 0.2, 1.0], 100, alternative='less')
+        self.assertTrue(np.allclose(power_binomial_proportions([0.0, 0.2], [0.0, 0.2] + effects[:2], 100,
+                                                               alternative='less'), 0.8))
+        self.assertTrue(np.isnan(effects[2]))
+
+        with self.assertRaises(ValueError):
+            power_binomial_proportions(0.5, 0.4, 0)
+        with self.assertRaises(ValueError):
+            minimum_detectable_effect_binomial_proportions(0.5, 100, alternative='invalid')
+
+    def test_adjust_p_values(self):
+        p_values = np.array([0.01, 0.04, 0.03, 0.005, np.nan])
+        self.assertTrue(np.allclose(adjust_p_values(p_values, 'bonferroni')[:4], [0.04, 0.16, 0.12, 0.02]))
+        self.assertTrue(np.allclose(adjust_p_values(p_values, 'holm')[:4], [0.03, 0.06, 0.06, 0.02]))
+        self.assertTrue(np.allclose(adjust_p_values(p_values, 'bh')[:4], [0.02, 0.04, 0.04, 0.02]))
+        self.assertTrue(np.isnan(adjust_p_values(p_values)[4]))
+
+        rng = np.random.default_rng(0)
+        p_values = rng.uniform(size=1000).astype(np.float32)
+        adjusted = adjust_p_values(p_values, 'by')
+        self.assertEqual(adjusted.dtype, np.float32)
+        self.assertTrue(np.allclose(adjusted, stats.false_discovery_control(p_values.astype(float), method='by')))
+
+        with self.assertRaises(ValueError):
+            adjust_p_values(p_values, 'invalid')
+        with self.assertRaises(ValueError):
+            adjust_p_values([0.5, 1.5])
+
+    def test_harmonic_number_without_arrays(self):
+        for m in [1, 10, 2 ** 16, 2 ** 16 + 1, 10 ** 6]:
+            self.assertAlmostEqual(_harmonic_number(m), np.sum(1 / np.arange(1, m + 1)), places=12)
+
+    def test_top_k_discoveries(self):
+        rng = np.random.default_rng(0)
+        p_values = np.concatenate((rng.uniform(0, 1e-6, 50), rng.uniform(size=20000))).astype(np.float32)
+        rng.shuffle(p_values)
+        for method in ['bonferroni', 'holm', 'bh', 'by']:
+            expected = np.flatnonzero(adjust_p_values(p_values, method) <= 0.05)
+            indices, discoveries, complete = top_k_discoveries(p_values, k=200, method=method, chunk_size=999)
+            self.assertTrue(complete)
+            self.assertTrue(np.array_equal(np.sort(indices), expected))
+            self.assertTrue(np.all(np.diff(discoveries) >= 0))
+
+        chunks = np.array_split(p_values, 7)
+        indices, discoveries, complete = top_k_discoveries(chunks, k=10, method='bh')
+        self.assertFalse(complete)
+        self.assertEqual(len(indices), 10)
+        self.assertTrue(set(indices) <= set(np.flatnonzero(adjust_p_values(p_values, 'bh') <= 0.05)))
+
+        with self.assertRaises(ValueError):
+            top_k_discoveries(p_values, k=0)
+
     def test_fishers_exact_test(self):
         p_value = fishers_exact_test(50, 100, 40, 100)
         self.assertAlmostEqual(p_value, 0.2007076, places=6)
@@ -88,6 +175,96 @@ class TestHypothesisTesting(unittest.TestCase):
         with self.assertRaises(ValueError):
             g_test_goodness_of_fit(binomial_data, expected_proportions=[0.2, 0.3, 0.4])
 
+    def test_chi_square_and_g_test_array_inputs(self):
+        binomial_data = [(10, 100), (20, 100), (30, 100), (40, 100)]
+        data = np.array(binomial_data)
+        for test in (chi_square_test, g_test_goodness_of_fit):
+            expected = test(binomial_data)
+            self.assertAlmostEqual(test(data), expected, places=12)
+            self.assertAlmostEqual(test(successes=data[:, 0], trials=data[:, 1]), expected, places=12)
+            self.assertAlmostEqual(test(data, expected_proportions=np.full(4, 0.25)), expected, places=12)
+
+            with self.assertRaises(ValueError):
+                test(data[:, :1])
+            with self.assertRaises(ValueError):
+                test(data.astype(float))
+            with self.assertRaises(ValueError):
+                test(successes=[10, 120], trials=[100, 100])
+            with self.assertRaises(ValueError):
+                test(data, successes=data[:, 0], trials=data[:, 1])
+
+    def test_g_test_goodness_of_fit_zero_cell(self):
+        p_value = g_test_goodness_of_fit([(0, 10), (5, 10), (3, 10)])
+        expected = stats.power_divergence([0, 5, 3], lambda_='log-likelihood').pvalue
+        self.assertAlmostEqual(p_value, expected, places=12)
+
+    def test_sparse_tests_match_dense(self):
+        from scipy import sparse
+        rng = np.random.default_rng(0)
+        dense = rng.poisson(3, 60)
+        dense[::4] = 0
+        proportions = rng.uniform(1, 2, 60)
+        proportions /= proportions.sum()
+        indices = np.flatnonzero(dense)
+        expected_counts = dense.sum() * proportions
+
+        p_value = chi_square_test_sparse((indices, dense[indices]), 60, proportions, chunk_size=8)
+        self.assertAlmostEqual(p_value, stats.chisquare(dense, expected_counts).pvalue, places=12)
+        p_value = g_test_sparse(sparse.csr_matrix(dense), expected_proportions=lambda i: proportions[i])
+        expected = stats.power_divergence(dense, expected_counts, lambda_='log-likelihood').pvalue
+        self.assertAlmostEqual(p_value, expected, places=12)
+
+        chunks = [(indices[:10], dense[indices[:10]]), (indices[10:], dense[indices[10:]])]
+        expected = stats.power_divergence(dense, lambda_='log-likelihood').pvalue
+        self.assertAlmostEqual(g_test_sparse(chunks, 60), expected, places=12)
+
+        with self.assertRaises(ValueError):
+            chi_square_test_sparse((indices, dense[indices]))
+        with self.assertRaises(ValueError):
+            chi_square_test_sparse((indices, dense[indices]), 10)
+
+    def test_independence_tests(self):
+        table = np.array([[10, 0, 5, 0], [3, 8, 2, 0], [0, 0, 0, 0], [4, 4, 9, 0]])
+        non_empty = table[[0, 1, 3]][:, :3]
+        result = stats.chi2_contingency(non_empty, correction=False)
+        self.assertAlmostEqual(chi_square_independence_test(table), result.pvalue, places=12)
+        result = stats.chi2_contingency(non_empty, correction=False, lambda_='log-likelihood')
+        self.assertAlmostEqual(g_test_independence(table), result.pvalue, places=12)
+        self.assertAlmostEqual(cramers_v(table), stats.contingency.association(non_empty), places=12)
+        self.assertAlmostEqual(cramers_v([[5, 0], [0, 5]]), 1.0)
+
+        with self.assertRaises(ValueError):
+            chi_square_independence_test([[1, 2, 3]])
+        with self.assertRaises(ValueError):
+            g_test_independence([[1.5, 2], [3, 4]])
+
+    def test_binomial_test(self):
+        for k, n, p0 in [(3, 10, 0.5), (7, 20, 0.3), (0, 15, 0.1), (15, 15, 0.9), (40, 100, 0.37)]:
+            for alternative in ['two-sided', 'greater', 'less']:
+                expected = stats.binomtest(k, n, p0, alternative).pvalue
+                self.assertAlmostEqual(binomial_test(k, n, p0, alternative), expected, places=12)
+
+        k = np.array([[1, 2], [3, 4]])
+        p_values = binomial_test(k, np.array([10, 12]), [[0.5], [0.3]])
+        self.assertEqual(p_values.shape, (2, 2))
+        self.assertAlmostEqual(p_values[1, 1], stats.binomtest(4, 12, 0.3).pvalue, places=12)
+
+        # Large and distinct nulls go through the probe search, small shared ones through the cached table.
+        n = np.array([10 ** 7, 54321, 3, 4096] + [50] * 100)
+        k = np.array([5001000, 20000, 0, 1400] + list(range(50)) * 2)
+        p_values = binomial_test(k, n, 0.37)
+        for i in [0, 1, 2, 3, 4, 60]:
+            self.assertAlmostEqual(p_values[i], stats.binomtest(int(k[i]), int(n[i]), 0.37).pvalue, places=12)
+        self.assertAlmostEqual(binomial_test(5001000, 10 ** 7, 0.5, 'greater'),
+                               stats.binomtest(5001000, 10 ** 7, 0.5, 'greater').pvalue, places=12)
+
+        with self.assertRaises(ValueError):
+            binomial_test(11, 10, 0.5)
+        with self.assertRaises(ValueError):
+            binomial_test(3, 10, 1.5)
+        with self.assertRaises(ValueError):
+            binomial_test(3, 10, 0.5, alternative='invalid')
+
     def test_proportion_z_test_zero_trials(self):
         with self.assertRaises(ValueError):
             proportion_z_test(0, 0, 0, 0)
@@ -157,6 +334,69 @@ class TestHypothesisTesting(unittest.TestCase):
         with self.assertRaises(ValueError):
             proportion_confidence_interval(success, trials, alpha=alpha)
 
+    def test_proportion_confidence_interval_batch(self):
+        lower, upper = proportion_confidence_interval_batch([5, 500], [10, 1000])
+        assert np.allclose(lower, [0.19010248384771922, 0.4690102483847719])
+        assert np.allclose(upper, [0.8098975161522808, 0.5309897516152281])
+
+        with self.assertRaises(ValueError):
+            proportion_confidence_interval_batch([5, 5], [10, 0])
+        with self.assertRaises(ValueError):
+            proportion_confidence_interval_batch([5], [10], alpha=1.1)
+
+    def test_proportion_z_test_batch(self):
+        successes1 = np.array([50, 50, 50, 0, 0])
+        trials1 = np.array([100, 100, 100, 10, 0])
+        successes2 = np.array([40, 40, 40, 0, 5])
+        trials2 = np.array([100, 100, 120, 10, 10])
+
+        z_stat, p_values, degenerate = proportion_z_test_batch(successes1, trials1, successes2, trials2)
+        self.assertTrue(np.array_equal(degenerate, [False, False, False, True, True]))
+        self.assertTrue(np.all(np.isnan(p_values[degenerate])))
+        self.assertAlmostEqual(p_values[0], 0.155218489684684, places=6)
+        self.assertAlmostEqual(p_values[2], proportion_z_test(50, 100, 40, 120), places=10)
+
+        _, p_values, _ = proportion_z_test_batch(successes1[:3], trials1[:3], successes2[:3], trials2[:3],
+                                                 alternative='greater')
+        self.assertAlmostEqual(p_values[0], 0.077609244842342, places=6)
+
+        with self.assertRaises(ValueError):
+            proportion_z_test_batch([50], [100], [40], [100], alternative='invalid')
+        with self.assertRaises(ValueError):
+            proportion_z_test_batch([150], [100], [40], [100])
+
+    def test_continuity_corrected_proportion_z_test_batch(self):
+        _, p_values, degenerate = continuity_corrected_proportion_z_test_batch([50, 30], [100, 70], [60, 0], [120, 0],
+                                                                               alternative='less')
+        self.assertAlmostEqual(p_values[0], continuity_corrected_proportion_z_test(50, 100, 60, 120, 'less'),
+                               places=10)
+        self.assertTrue(degenerate[1])
+
+    def test_fishers_exact_test_batch_matches_scipy(self):
+        rng = np.random.default_rng(0)
+        total1 = rng.integers(1, 40, 200)
+        total2 = rng.integers(1, 40, 200)
+        success1 = rng.binomial(total1, 0.4)
+        success2 = rng.binomial(total2, rng.choice([0.0, 0.4, 0.7], 200))
+
+        for alternative in ['two-sided', 'less', 'greater']:
+            p_values = fishers_exact_test_batch(success1, total1, success2, total2, alternative=alternative)
+            expected = [fishers_exact_test(int(a), int(n), int(b), int(m), alternative=alternative)
+                        for a, n, b, m in zip(success1, total1, success2, total2)]
+            self.assertTrue(np.allclose(p_values, expected, rtol=1e-9, atol=0))
+
+        chunked = fishers_exact_test_batch(success1, total1, success2, total2, n_workers=2, max_cells=500)
+        self.assertTrue(np.allclose(chunked, fishers_exact_test_batch(success1, total1, success2, total2)))
+
+    def test_fishers_exact_test_batch_edge_cases(self):
+        p_values = fishers_exact_test_batch([50, 0, 0], [100, 0, 10], [40, 0, 0], [100, 5, 10])
+        self.assertAlmostEqual(p_values[0], 0.2007076, places=6)
+        self.assertTrue(np.isnan(p_values[1]))
+        self.assertEqual(p_values[2], 1.0)
+
+        with self.assertRaises(ValueError):
+            fishers_exact_test_batch([50], [100], [40], [100], alternative='invalid')
+
 
 def main():
     unittest.main(argv=['first-arg-is-ignored'], exit=False, verbosity=3)
@@ -0,0 +1,91 @@
+import sys
+import os
+current_directory = os.getcwd()
+main_directory_path = os.path.abspath(os.path.join(current_directory, '..'))
+sys.path.insert(0, main_directory_path)
+
+import unittest
+from scipy import stats
+from monte_carlo_testing import *
+from hypothesis_testing import power_analysis_binomial_proportions
+
+
+class TestMonteCarloTesting(unittest.TestCase):
+
+    def test_monte_carlo_proportion_test(self):
+        p_value, n_simulations = monte_carlo_proportion_test(7, 20, 2, 20, alternative='greater',
+                                                             max_simulations=200000, seed=1)
+        self.assertAlmostEqual(p_value, stats.fisher_exact([[7, 13], [2, 18]], alternative='greater')[1], places=2)
+
+        p_value, n_simulations = monte_carlo_proportion_test(30, 50, 10, 50, seed=1)
+        self.assertLess(p_value, 0.05)
+        self.assertEqual(n_simulations, 10000)
+
+    def test_early_stopping_and_budget(self):
+        p_value, n_simulations = monte_carlo_proportion_test(5, 20, 5, 20, batch_size=1000, seed=2)
+        self.assertEqual(n_simulations, 1000)
+        self.assertGreater(p_value, 0.05)
+
+        # A p-value close to alpha uses the whole budget.
+        p_value, n_simulations = monte_carlo_proportion_test(7, 20, 2, 20, alternative='greater', alpha=0.064,
+                                                             max_simulations=5000, batch_size=1000, seed=2)
+        self.assertEqual(n_simulations, 5000)
+
+    def test_parallel_matches_serial(self):
+        serial = monte_carlo_chi_square_test([(3, 100), (5, 100), (9, 100)], alpha=0.2, batch_size=500, seed=3)
+        parallel = monte_carlo_chi_square_test([(3, 100), (5, 100), (9, 100)], alpha=0.2, batch_size=500,
+                                               n_workers=2, seed=3)
+        self.assertEqual(serial, parallel)
+
+    def test_monte_carlo_chi_square_test(self):
+        p_value, _ = monte_carlo_chi_square_test(successes=[10, 20, 30, 40], trials=[100, 100, 100, 100], seed=4)
+        self.assertLess(p_value, 0.001)
+
+        p_value, _ = monte_carlo_chi_square_test([(8, 100), (12, 100)], expected_proportions=[0.4, 0.6],
+                                                 max_simulations=100000, seed=4)
+        self.assertGreater(p_value, 0.5)
+
+    def test_monte_carlo_power_matches_power_analysis(self):
+        sample_size = power_analysis_binomial_proportions(0.1, 0.15)
+        result = monte_carlo_power(0.1, 0.15, sample_size, n_simulations=20000, seed=5)
+        self.assertLess(abs(result['power'] - 0.8), 4 * result['power_standard_error'])
+        self.assertLess(abs(result['size'] - 0.05), 4 * result['size_standard_error'])
+        self.assertEqual(result['n_simulations'], 20000)
+
+        chi_square = monte_carlo_power(0.1, 0.15, sample_size, test='chi_square_test', n_simulations=20000, seed=5)
+        self.assertEqual(chi_square['power'], result['power'])
+
+        # Fisher's exact test is conservative
+        fisher = monte_carlo_power(0.1, 0.15, sample_size, test='fishers_exact_test', n_simulations=20000, seed=5)
+        self.assertLess(fisher['size'], result['size'])
+
+    def test_monte_carlo_power_parallel_matches_serial(self):
+        serial = monte_carlo_power(0.3, 0.2, 100, alternative='greater', ratio=2, n_simulations=5000, batch_size=1000,
+                                   seed=6)
+        parallel = monte_carlo_power(0.3, 0.2, 100, alternative='greater', ratio=2, n_simulations=5000,
+                                     batch_size=1000, n_workers=2, seed=6)
+        self.assertEqual(serial, parallel)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            monte_carlo_proportion_test(5, 20, 5, 20, alternative='invalid')
+        with self.assertRaises(ValueError):
+            monte_carlo_proportion_test(5, 0, 5, 20)
+        with self.assertRaises(ValueError):
+            monte_carlo_proportion_test(5, 20, 5, 20, max_simulations=0)
+        with self.assertRaises(ValueError):
+            monte_carlo_chi_square_test([(0, 10), (0, 10)])
+        with self.assertRaises(ValueError):
+            monte_carlo_power(0.1, 0.2, 100, test='invalid')
+        with self.assertRaises(ValueError):
+            monte_carlo_power(0.1, 0.2, 100, test='chi_square_test', alternative='greater')
+        with self.assertRaises(ValueError):
+            monte_carlo_power(0.1, 1.2, 100)
+
+
+def main():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False, verbosity=3)
+
+
+if __name__ == "__main__":
+    main()
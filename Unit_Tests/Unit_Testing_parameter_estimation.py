@@ -5,6 +5,7 @@ main_directory_path = os.path.abspath(os.path.join(current_directory, '..'))
 sys.path.insert(0, main_directory_path)
 
 import unittest
+import numpy as np
 from parameter_estimation import *
 
 
@@ -22,6 +23,23 @@ class TestParameterEstimation(unittest.TestCase):
         with self.assertRaises(ValueError):
             estimate_parameters([])
 
+    def test_estimate_parameters_streaming_inputs(self):
+        expected = estimate_parameters(self.sample_data)
+        chunks = [np.array(self.sample_data[:3]), np.array(self.sample_data[3:])]
+        self.assertEqual(estimate_parameters(iter(self.sample_data)), expected)
+        n_estimate, p_estimate = estimate_parameters(iter(chunks))
+        self.assertEqual(n_estimate, expected[0])
+        self.assertAlmostEqual(p_estimate, expected[1], places=12)
+
+    def test_moment_accumulator_incremental_update(self):
+        accumulator = MomentAccumulator()
+        for x in self.sample_data:
+            accumulator.update(x)
+        self.assertEqual(accumulator.count, len(self.sample_data))
+        self.assertAlmostEqual(accumulator.mean, np.mean(self.sample_data), places=12)
+        self.assertAlmostEqual(accumulator.variance, np.var(self.sample_data), places=12)
+        self.assertEqual(estimate_parameters(accumulator)[0], 10)
+
     def test_log_likelihood(self):
         p_estimate = 0.7
         log_likelihood_value = log_likelihood(p_estimate, self.sample_data)
@@ -32,10 +50,37 @@ class TestParameterEstimation(unittest.TestCase):
         self.assertEqual(n_estimate, 10)
         self.assertAlmostEqual(p_estimate, 0.7, places=1)
 
+    def test_log_likelihood_matches_scipy(self):
+        from scipy.stats import binom
+        expected = np.sum(binom.logpmf(self.sample_data, 12, 0.6))
+        self.assertAlmostEqual(log_likelihood(0.6, self.sample_data, n_trials=12), expected, places=8)
+
+    def test_mle_estimate_parameters_known_n_trials(self):
+        n_estimate, p_estimate = mle_estimate_parameters(self.sample_data, n_trials=12)
+        self.assertEqual(n_estimate, 12)
+        self.assertAlmostEqual(p_estimate, np.mean(self.sample_data) / 12, places=12)
+
+        with self.assertRaises(ValueError):
+            mle_estimate_parameters(self.sample_data, n_trials=9)
+
     def test_mle_estimate_parameters_empty_data(self):
         with self.assertRaises(ValueError):
             mle_estimate_parameters([])
 
+    def test_profile_mle_estimate_parameters(self):
+        rng = np.random.default_rng(0)
+        sample_data = rng.binomial(50, 0.6, 100000)
+        n_estimate, p_estimate = profile_mle_estimate_parameters(sample_data)
+        self.assertEqual(n_estimate, 50)
+        self.assertAlmostEqual(p_estimate, 0.6, places=2)
+
+    def test_profile_mle_estimate_parameters_unbounded(self):
+        # Overdispersed data has no finite maximum in n.
+        with self.assertRaises(ValueError):
+            profile_mle_estimate_parameters([0, 10, 0, 10, 5], n_max=10000)
+        with self.assertRaises(ValueError):
+            profile_mle_estimate_parameters([])
+
     def test_confidence_interval_normal_approximation(self):
         lower_bound, upper_bound = confidence_interval_normal_approximation(self.sample_data, confidence_level=0.95)
         self.assertAlmostEqual(lower_bound, 0.4160, places=4)
@@ -67,6 +112,85 @@ class TestParameterEstimation(unittest.TestCase):
         with self.assertRaises(ValueError):
             confidence_interval_agresti_coull(self.sample_data, confidence_level=-0.5)
 
+    def test_confidence_interval_batch_functions(self):
+        from scipy.stats import beta as beta_dist
+        successes = np.array([0, 3, 72, 10])
+        trials = np.array([10, 10, 100, 10])
+
+        lower, upper = confidence_interval_clopper_pearson_batch(successes, trials)
+        self.assertEqual(lower[0], 0.0)
+        self.assertEqual(upper[3], 1.0)
+        self.assertAlmostEqual(lower[2], beta_dist.ppf(0.025, 72, 29), places=10)
+        self.assertAlmostEqual(upper[2], beta_dist.ppf(0.975, 73, 28), places=10)
+
+        lower, upper = confidence_interval_normal_approximation_batch(successes, trials)
+        self.assertTrue(np.all((0 <= lower) & (lower <= successes / trials) & (upper <= 1)))
+        self.assertAlmostEqual(upper[2] - lower[2], 2 * 1.959964 * np.sqrt(0.72 * 0.28 / 100), places=5)
+
+        lower, upper = confidence_interval_agresti_coull_batch(successes, trials)
+        self.assertEqual(lower.shape, (4,))
+        self.assertTrue(np.all(lower < upper))
+
+    def test_confidence_interval_batch_invalid_input(self):
+        with self.assertRaises(ValueError):
+            confidence_interval_clopper_pearson_batch([5, 11], [10, 10])
+        with self.assertRaises(ValueError):
+            confidence_interval_agresti_coull_batch([0], [0])
+        with self.assertRaises(ValueError):
+            confidence_interval_normal_approximation_batch([0.5], [1])
+
+    def test_sufficient_statistics_merge(self):
+        left = SufficientStatistics().update_from(self.sample_data[:4])
+        right = SufficientStatistics().update_from(np.array(self.sample_data[4:]))
+        merged = left.merge(right)
+        full = SufficientStatistics().update_from(self.sample_data)
+
+        self.assertEqual(merged.count, full.count)
+        self.assertEqual(merged.total, sum(self.sample_data))
+        self.assertAlmostEqual(merged.m2, full.m2, places=10)
+        self.assertTrue(np.array_equal(merged.histogram, full.histogram))
+
+    def test_sufficient_statistics_serialization(self):
+        import json
+        statistics = SufficientStatistics().update_from(self.sample_data)
+        restored = SufficientStatistics.from_dict(json.loads(json.dumps(statistics.to_dict())))
+        self.assertEqual(restored.to_dict(), statistics.to_dict())
+
+    def test_estimators_finish_from_sufficient_statistics(self):
+        statistics = SufficientStatistics().update_from(self.sample_data)
+        self.assertEqual(estimate_parameters(statistics), estimate_parameters(self.sample_data))
+        self.assertEqual(mle_estimate_parameters(statistics), mle_estimate_parameters(self.sample_data))
+        self.assertAlmostEqual(log_likelihood(0.7, statistics), -18.3302, places=4)
+        for interval in [confidence_interval_normal_approximation, confidence_interval_clopper_pearson,
+                         confidence_interval_agresti_coull]:
+            self.assertTrue(np.allclose(interval(statistics), interval(self.sample_data)))
+        with self.assertRaises(ValueError):
+            confidence_interval_clopper_pearson(SufficientStatistics())
+
+    def test_beta_binomial_posterior_single_stream(self):
+        from scipy.stats import beta as beta_dist
+        posterior = BetaBinomialPosterior()
+        posterior.update(3, 10).update(4, 10)
+        self.assertAlmostEqual(posterior.mean, 8 / 22, places=12)
+        lower_bound, upper_bound = posterior.credible_interval()
+        self.assertAlmostEqual(lower_bound, beta_dist.ppf(0.025, 8, 14), places=10)
+        self.assertAlmostEqual(upper_bound, beta_dist.ppf(0.975, 8, 14), places=10)
+
+    def test_beta_binomial_posterior_many_streams(self):
+        posterior = BetaBinomialPosterior(n_streams=3, prior_alpha=0.5, prior_beta=0.5)
+        posterior.update([1, 2, 3], [4, 4, 4])
+        posterior.update([1, 1], [1, 1], streams=[2, 2])
+        self.assertTrue(np.allclose(posterior.alpha, [1.5, 2.5, 5.5]))
+        self.assertTrue(np.allclose(posterior.beta, [3.5, 2.5, 1.5]))
+
+        first = posterior.credible_interval(0.9)
+        self.assertIs(posterior.credible_interval(0.9), first)
+        posterior.update([0, 0, 1], [1, 1, 1])
+        self.assertIsNot(posterior.credible_interval(0.9), first)
+
+        with self.assertRaises(ValueError):
+            posterior.update([1, 2], [3, 3])
+
 
 def main():
     unittest.main(argv=['first-arg-is-ignored'], exit=False, verbosity=3)
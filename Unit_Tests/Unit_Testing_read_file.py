@@ -25,6 +25,15 @@ class TestFiles(unittest.TestCase):
         file_test = test_files()
         self.assertEqual(file_test[0], [1, 3, 99, 100, 120, 32, 330, 23, 76, 44, 31])
         self.assertEqual(file_test[1], [0, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+
+    def test_read_contingency_table(self):
+        rows, columns, table = rv.read_contingency_table('binomial-data.csv', 'condition', 'selection')
+        self.assertEqual(rows, ['Baseline', 'Treatment'])
+        self.assertEqual(columns, ['Option 1', 'Option 2'])
+        self.assertEqual(table.tolist(), [[320, 400], [452, 268]])
+
+        with self.assertRaises(ValueError):
+            rv.read_contingency_table('binomial-data.csv', 'condition', 'missing')
         
 if __name__ == "__main__":
     unittest.main(argv=['first-arg-is-ignored'], exit = False, verbosity = 3)
@@ -0,0 +1,61 @@
+import sys
+import os
+current_directory = os.getcwd()
+main_directory_path = os.path.abspath(os.path.join(current_directory, '..'))
+sys.path.insert(0, main_directory_path)
+
+import unittest
+import numpy as np
+from sequential_testing import *
+
+
+class TestSequentialTesting(unittest.TestCase):
+
+    def test_type_one_error_under_repeated_looks(self):
+        rng = np.random.default_rng(0)
+        monitor = SequentialABMonitor(2000, mixture_variance=1e-3)
+        for _ in range(100):
+            monitor.update(rng.binomial(50, 0.1, 2000), 50, rng.binomial(50, 0.1, 2000), 50)
+        self.assertLess(np.mean(monitor.rejected), 0.05)
+
+    def test_detects_difference(self):
+        rng = np.random.default_rng(1)
+        monitor = SequentialABMonitor(200, mixture_variance=1e-3)
+        for _ in range(100):
+            monitor.update(rng.binomial(100, 0.1, 200), 100, rng.binomial(100, 0.15, 200), 100)
+        self.assertGreater(np.mean(monitor.rejected), 0.9)
+        self.assertTrue(np.all(monitor.difference[monitor.rejected] > 0))
+
+    def test_p_values_never_increase(self):
+        monitor = SequentialABMonitor()
+        monitor.update(10, 100, 30, 100)
+        p_value = float(monitor.p_values)
+        monitor.update(30, 100, 10, 100)
+        self.assertLessEqual(float(monitor.p_values), p_value)
+
+    def test_update_by_experiment_index(self):
+        by_index = SequentialABMonitor(3)
+        by_index.update([5, 7, 9], [20, 20, 20], [8, 9, 1], [20, 20, 20], experiments=[2, 0, 2])
+        full = SequentialABMonitor(3)
+        full.update([7, 0, 14], [20, 0, 40], [9, 0, 9], [20, 0, 40])
+        self.assertTrue(np.array_equal(by_index.trials_a, full.trials_a))
+        self.assertTrue(np.allclose(by_index.p_values, full.p_values))
+        self.assertEqual(by_index.p_values[1], 1.0)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            SequentialABMonitor(alpha=1.5)
+        with self.assertRaises(ValueError):
+            SequentialABMonitor(mixture_variance=0)
+        with self.assertRaises(ValueError):
+            SequentialABMonitor(3).update([1, 2], [2, 2], [1, 2], [2, 2])
+        with self.assertRaises(ValueError):
+            SequentialABMonitor().update(5, 3, 1, 3)
+
+
+def main():
+    unittest.main(argv=['first-arg-is-ignored'], exit=False, verbosity=3)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ sys.path.insert(0, main_directory_path)
 
 import unittest
 import numpy as np
-from simulation import BinomialSimulation
+from simulation import BinomialSimulation, simulate_parameter_sweep
 
 
 class TestBinomialSimulation(unittest.TestCase):
@@ -157,6 +157,135 @@ class TestBinomialSimulation(unittest.TestCase):
         self.assertTrue(np.all(results >= 0))
         self.assertTrue(np.all(results <= n_trials))
 
+    def test_chunked_simulation_keeps_histogram(self):
+        sim = BinomialSimulation(20, 0.3, 10007)
+        sim.run_simulation(chunk_size=1000)
+        self.assertIsNone(sim.results)
+        histogram = sim.get_results(as_histogram=True)
+        self.assertEqual(len(histogram), 21)
+        self.assertEqual(histogram.sum(), 10007)
+        self.assertEqual(sim.statistics.count, 10007)
+        with self.assertRaises(ValueError):
+            sim.get_results()
+        with self.assertRaises(ValueError):
+            sim.plot_success_probability_evolution()
+
+    def test_calculate_metrics_from_histogram(self):
+        sim = BinomialSimulation(20, 0.3, 10000)
+        sim.run_simulation()
+        metrics = sim.calculate_metrics()
+        expected = sim.calculate_metrics(sim.get_results())
+        for key in ['mean', 'median', 'std_dev']:
+            self.assertAlmostEqual(metrics[key], expected[key])
+
+        sim = BinomialSimulation(4, 0.5, 4)
+        sim.results = np.array([1, 2, 3, 4])
+        self.assertEqual(sim.calculate_metrics()['median'], 2.5)
+
+    def test_compact_result_dtype(self):
+        for n_trials, dtype in [(10, np.uint8), (255, np.uint8), (256, np.uint16), (70000, np.uint32)]:
+            sim = BinomialSimulation(n_trials, 0.5, 100)
+            sim.run_simulation()
+            self.assertEqual(sim.get_results().dtype, dtype)
+
+        sim = BinomialSimulation(10, 0.5, 100)
+        sim.run_simulation(dtype=np.int32)
+        self.assertEqual(sim.get_results().dtype, np.int32)
+        with self.assertRaises(ValueError):
+            BinomialSimulation(300, 0.5, 100).run_simulation(dtype=np.uint8)
+        with self.assertRaises(ValueError):
+            sim.run_simulation(dtype=np.float64)
+
+        # Integral float n_trials still get an unsigned integer type, so large counts are not rounded.
+        sim = BinomialSimulation(100000.0, 0.3, 5)
+        sim.run_simulation()
+        self.assertEqual(sim.get_results().dtype, np.uint32)
+        self.assertEqual(len(sim.get_results(as_histogram=True)), 100001)
+        self.assertAlmostEqual(sim.calculate_metrics()['mean'], np.mean(sim.get_results()))
+        self.assertAlmostEqual(sim.calculate_metrics(sim.get_results())['mean'], np.mean(sim.get_results()))
+        sim.run_simulation(chunk_size=2)
+        self.assertEqual(sim.get_results(as_histogram=True).sum(), 5)
+        with self.assertRaises(ValueError):
+            BinomialSimulation(10.5, 0.3, 5).run_simulation()
+
+    def test_seeded_parallel_simulation(self):
+        first = BinomialSimulation(20, 0.3, 10001)
+        first.run_simulation(n_workers=2, seed=7)
+        second = BinomialSimulation(20, 0.3, 10001)
+        second.run_simulation(n_workers=2, seed=7)
+        self.assertTrue(np.array_equal(first.get_results(), second.get_results()))
+        self.assertEqual(len(first.get_results()), 10001)
+
+        chunked = BinomialSimulation(20, 0.3, 10001)
+        chunked.run_simulation(chunk_size=1000, n_workers=2, seed=7)
+        self.assertTrue(np.array_equal(chunked.get_results(as_histogram=True), first.get_results(as_histogram=True)))
+
+        serial = BinomialSimulation(20, 0.3, 10001)
+        serial.run_simulation(seed=7)
+        self.assertFalse(np.array_equal(serial.get_results(), first.get_results()))
+        with self.assertRaises(ValueError):
+            serial.run_simulation(n_workers=0)
+
+    def test_cross_validation_covers_every_result(self):
+        sim = BinomialSimulation(20, 0.3, 1003)
+        sim.run_simulation(seed=3)
+        results = sim.get_results()
+        metrics = sim.cross_validate_hypothesis_testing("proportion_z_test", n_folds=4)
+        folds = [results[:250], results[250:501], results[501:752], results[752:]]
+        self.assertAlmostEqual(metrics['mean'], np.mean([np.mean(fold) for fold in folds]))
+        self.assertAlmostEqual(metrics['median'], np.mean([np.median(fold) for fold in folds]))
+        self.assertAlmostEqual(metrics['std_dev'], np.mean([np.std(fold) for fold in folds]))
+        self.assertEqual(sim.cross_validate_hypothesis_testing("proportion_z_test", n_folds=4, n_workers=2), metrics)
+        with self.assertRaises(ValueError):
+            sim.cross_validate_hypothesis_testing("proportion_z_test", n_folds=2000)
+
+        # A float n_trials, as accepted by the constructor, still sizes the fold histograms.
+        sim = BinomialSimulation(100.0, 0.5, 1000)
+        sim.run_simulation(seed=3)
+        metrics = sim.cross_validate_hypothesis_testing("proportion_z_test", n_folds=4)
+        self.assertAlmostEqual(metrics['mean'], np.mean(sim.get_results()))
+
+    def test_parameter_sweep(self):
+        n_trials = np.array([10, 300])[:, None]
+        p_success = np.array([0.0, 0.2, 0.7, 1.0])
+        results, metrics = simulate_parameter_sweep(n_trials, p_success, 2000, seed=5)
+        self.assertEqual(results.shape, (2, 4, 2000))
+        self.assertEqual(results.dtype, np.uint16)
+        self.assertTrue(np.all(results[:, 0] == 0))
+        self.assertTrue(np.all(results[1, 3] == 300))
+        self.assertTrue(np.allclose(metrics['mean'], results.mean(axis=-1)))
+        self.assertTrue(np.allclose(metrics['median'], np.median(results, axis=-1)))
+        self.assertTrue(np.allclose(metrics['std_dev'], results.std(axis=-1)))
+
+        histograms, histogram_metrics = simulate_parameter_sweep(n_trials, p_success, 2000, as_histogram=True, seed=5)
+        self.assertEqual(histograms.shape, (2, 4, 301))
+        self.assertTrue(np.all(histograms.sum(axis=-1) == 2000))
+        self.assertTrue(np.allclose(histogram_metrics['mean'], metrics['mean']))
+
+        parallel, _ = simulate_parameter_sweep([5, 6, 7], [0.1, 0.5, 0.9], 100, n_workers=2, seed=5)
+        self.assertEqual(parallel.shape, (3, 100))
+        self.assertTrue(np.array_equal(parallel, simulate_parameter_sweep([5, 6, 7], [0.1, 0.5, 0.9], 100,
+                                                                          n_workers=2, seed=5)[0]))
+        with self.assertRaises(ValueError):
+            simulate_parameter_sweep([5, -1], 0.5, 100)
+        with self.assertRaises(ValueError):
+            simulate_parameter_sweep(5, [0.5, 1.5], 100)
+        with self.assertRaises(ValueError):
+            simulate_parameter_sweep(np.arange(1, 201) * 5000, 0.5, 5, as_histogram=True)
+
+        # Returning the results does not build the cells x max(n_trials) histograms.
+        results, metrics = simulate_parameter_sweep(np.arange(1, 201) * 5000, 0.5, 5, seed=5)
+        self.assertEqual(results.shape, (200, 5))
+        self.assertTrue(np.allclose(metrics['median'], np.median(results, axis=-1)))
+
+    def test_compact_results_metrics(self):
+        sim = BinomialSimulation(20, 0.3, 10000)
+        sim.run_simulation()
+        metrics = sim.calculate_metrics(sim.get_results())
+        expected = sim.calculate_metrics(list(sim.get_results()))
+        for key in ['mean', 'median', 'std_dev']:
+            self.assertAlmostEqual(metrics[key], expected[key])
+
 def main():
     unittest.main(argv=['first-arg-is-ignored'], exit=False, verbosity=3)
 
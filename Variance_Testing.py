@@ -1,5 +1,5 @@
 import math
-import scipy
+from critical_values import norm_ppf, t_ppf
 
 
 def odds_ratio(exposed_yes, not_exposed_yes, exposed_no, not_exposed_no):
@@ -135,7 +135,7 @@ def t_test(mean1, mean2, stdev1, stdev2, count1, count2, alpha):
     
     degrees_of_freedom = (count1 + count2) - 2
     
-    critical_value = scipy.stats.t.ppf(alpha, degrees_of_freedom)
+    critical_value = t_ppf(alpha, degrees_of_freedom)
     
     if t_value < critical_value:
         return "Reject null hypothesis"
@@ -188,7 +188,7 @@ def z_test(sample_size, null_hypothesized_value, observed_proportion, alpha):
     
     z_score = numerator / denominator
     
-    critical_value = scipy.stats.norm.ppf(alpha)
+    critical_value = norm_ppf(alpha)
     
     if z_score < critical_value:
         return "Reject null hypothesis"
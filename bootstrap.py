@@ -0,0 +1,158 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from critical_values import norm_ppf, norm_cdf
+from parameter_estimation import value_counts, _as_sufficient_statistics
+
+
+def _estimate_from_counts(values, counts, parameter, estimator):
+    """
+    Estimate n or p for every row of a matrix of value counts at once.
+
+    :param values: (ndarray) The distinct sample values
+    :param counts: (ndarray) A (rows, distinct values) matrix of counts for each value
+    :param parameter: (str) The parameter to estimate, 'p' or 'n'
+    :param estimator: (str) The estimator to use, 'moments' or 'mle'
+
+    :return: (ndarray) The estimate for every row, NaN where the estimator is undefined
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    sample_size = counts.sum(axis=1)
+    sample_mean = counts @ values / sample_size
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if estimator == 'mle':
+            # The largest value present in each row is the MLE of n used by mle_estimate_parameters.
+            present = counts > 0
+            n_estimate = values[values.size - 1 - np.argmax(present[:, ::-1], axis=1)]
+            p_estimate = np.where(n_estimate > 0, sample_mean / n_estimate, 0.0)
+        else:
+            sample_variance = counts @ values ** 2 / sample_size - sample_mean ** 2
+            # As in estimate_parameters, only p >= 1 is replaced by 0.99.
+            p_estimate = 1 - sample_variance / sample_mean
+            p_estimate = np.where(p_estimate >= 1, 0.99, p_estimate)
+            p_estimate = np.where(sample_variance > 0, p_estimate, np.nan)
+            n_estimate = np.round(sample_mean / p_estimate)
+
+    return p_estimate if parameter == 'p' else n_estimate
+
+
+def _bootstrap_batch(task):
+    """
+    Draw one batch of multinomial resamples of the value-count histogram and return their estimates. Module level so
+    that it can be sent to worker processes.
+    """
+    values, counts, parameter, estimator, size, seed_sequence = task
+    rng = np.random.default_rng(seed_sequence)
+    sample_size = int(counts.sum())
+    resampled_counts = rng.multinomial(sample_size, counts / sample_size, size=size)
+    return _estimate_from_counts(values, resampled_counts, parameter, estimator)
+
+
+def bootstrap_distribution(sample_data, parameter='p', estimator='moments', n_resamples=1000, batch_size=1000,
+                           n_workers=1, seed=None):
+    """
+    Generate the bootstrap distribution of an estimate of n or p. The sample is compressed to a value-count
+    histogram once and every resample is drawn as a multinomial count vector over the distinct values, so the cost
+    scales with the number of distinct values rather than with the sample size. Each batch gets its own child of one
+    SeedSequence, so the result depends only on the seed and the batch size, not on the number of workers.
+
+    :param sample_data: (iterable) Binomial samples with the same number of trials and success probability
+    :param parameter: (str, optional) The parameter to estimate, 'p' or 'n' (default is 'p')
+    :param estimator: (str, optional) The estimator to use, 'moments' or 'mle' (default is 'moments')
+    :param n_resamples: (int, optional) The number of bootstrap resamples (default is 1000)
+    :param batch_size: (int, optional) The number of resamples drawn per batch (default is 1000)
+    :param n_workers: (int, optional) The number of worker processes to spread the batches over (default is 1)
+    :param seed: (int, optional) A seed value for the random number generator, if reproducibility is desired
+
+    :return: (ndarray) The bootstrap estimates, NaN where the estimator is undefined for a resample
+    """
+    if parameter not in ['p', 'n']:
+        raise ValueError("Invalid parameter. Choose from 'p' or 'n'.")
+    if estimator not in ['moments', 'mle']:
+        raise ValueError("Invalid estimator. Choose from 'moments' or 'mle'.")
+    if not isinstance(n_resamples, int) or n_resamples < 1:
+        raise ValueError("n_resamples must be a positive integer.")
+    if not isinstance(batch_size, int) or batch_size < 1:
+        raise ValueError("batch_size must be a positive integer.")
+    if not isinstance(n_workers, int) or n_workers < 1:
+        raise ValueError("n_workers must be a positive integer.")
+
+    values, counts = value_counts(sample_data)
+    if values.size == 0:
+        raise ValueError("Sample data cannot be empty.")
+
+    batch_sizes = [batch_size] * (n_resamples // batch_size)
+    if n_resamples % batch_size:
+        batch_sizes.append(n_resamples % batch_size)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+    tasks = [(values, counts, parameter, estimator, size, seed_sequence)
+             for size, seed_sequence in zip(batch_sizes, seed_sequences)]
+
+    if n_workers == 1:
+        estimates = [_bootstrap_batch(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            estimates = list(executor.map(_bootstrap_batch, tasks))
+
+    return np.concatenate(estimates)
+
+
+def bootstrap_confidence_interval(sample_data, parameter='p', estimator='moments', confidence_level=0.95,
+                                  method='percentile', n_resamples=1000, batch_size=1000, n_workers=1, seed=None):
+    """
+    Calculate a bootstrap confidence interval for the number of trials (n) or the probability of success (p) of a
+    binomial distribution, using the percentile or the bias-corrected and accelerated (BCa) method. The BCa
+    acceleration comes from a jackknife over the distinct values weighted by their counts, so it also costs
+    O(distinct values) instead of O(sample size).
+
+    :param sample_data: (iterable) Binomial samples with the same number of trials and success probability
+    :param parameter: (str, optional) The parameter to estimate, 'p' or 'n' (default is 'p')
+    :param estimator: (str, optional) The estimator to use, 'moments' or 'mle' (default is 'moments')
+    :param confidence_level: (float, optional) The desired confidence level (default is 0.95)
+    :param method: (str, optional) The interval method, 'percentile' or 'bca' (default is 'percentile')
+    :param n_resamples: (int, optional) The number of bootstrap resamples (default is 1000)
+    :param batch_size: (int, optional) The number of resamples drawn per batch (default is 1000)
+    :param n_workers: (int, optional) The number of worker processes to spread the batches over (default is 1)
+    :param seed: (int, optional) A seed value for the random number generator, if reproducibility is desired
+
+    :return: (tuple) A tuple containing the lower and upper bounds of the confidence interval
+    """
+    if not 0 < confidence_level < 1:
+        raise ValueError("Confidence level must be between 0 and 1.")
+    if method not in ['percentile', 'bca']:
+        raise ValueError("Invalid method. Choose from 'percentile' or 'bca'.")
+
+    # Summarised once, so that iterators and streams are only read once for the resamples and the jackknife.
+    statistics = _as_sufficient_statistics(sample_data)
+    estimates = bootstrap_distribution(statistics, parameter, estimator, n_resamples, batch_size, n_workers, seed)
+    estimates = estimates[~np.isnan(estimates)]
+    if estimates.size == 0:
+        raise ValueError("The estimator is undefined for every resample. Provide a more varied sample data.")
+
+    alpha = 1 - confidence_level
+    quantiles = np.array([alpha / 2, 1 - alpha / 2])
+
+    if method == 'bca':
+        values, counts = value_counts(statistics)
+        estimate = _estimate_from_counts(values, counts[None, :], parameter, estimator)[0]
+
+        # Bias correction from the share of resamples below the estimate (ties counted as half).
+        below = np.mean(estimates < estimate) + 0.5 * np.mean(estimates == estimate)
+        z0 = norm_ppf(np.clip(below, 1 / (2 * estimates.size), 1 - 1 / (2 * estimates.size)))
+
+        # Acceleration from the jackknife: leaving out one observation of a value gives the same estimate for every
+        # observation of that value, so each distinct value is evaluated once and weighted by its count.
+        jackknife_counts = counts[None, :] - np.eye(values.size, dtype=counts.dtype)
+        jackknife = _estimate_from_counts(values, jackknife_counts, parameter, estimator)
+        weights = counts[~np.isnan(jackknife)]
+        jackknife = jackknife[~np.isnan(jackknife)]
+        deviations = np.dot(weights, jackknife) / weights.sum() - jackknife
+        denominator = 6 * np.dot(weights, deviations ** 2) ** 1.5
+        acceleration = np.dot(weights, deviations ** 3) / denominator if denominator > 0 else 0.0
+
+        z_alpha = norm_ppf(quantiles)
+        quantiles = norm_cdf(z0 + (z0 + z_alpha) / (1 - acceleration * (z0 + z_alpha)))
+
+    lower_bound, upper_bound = np.quantile(estimates, quantiles)
+
+    return lower_bound, upper_bound
@@ -0,0 +1,202 @@
+import math
+import numpy as np
+from functools import lru_cache
+from scipy import special
+
+
+# Significance levels and degrees of freedom whose quantiles are precomputed at import time. Every level is stored
+# as alpha, 1 - alpha, alpha / 2 and 1 - alpha / 2, which covers one- and two-sided critical values and the usual
+# power levels (0.8, 0.9, 0.95, 0.99).
+COMMON_ALPHAS = (0.2, 0.1, 0.05, 0.025, 0.02, 0.01, 0.005, 0.001)
+COMMON_DEGREES_OF_FREEDOM = tuple(range(1, 101))
+CACHE_SIZE = 4096
+
+_COMMON_LEVELS = tuple(sorted({level for alpha in COMMON_ALPHAS
+                               for level in (alpha, 1 - alpha, alpha / 2, 1 - alpha / 2)}))
+
+_NORM_PPF_TABLE = dict(zip(_COMMON_LEVELS, special.ndtri(_COMMON_LEVELS).tolist()))
+
+_t_table_levels, _t_table_df = np.meshgrid(_COMMON_LEVELS, COMMON_DEGREES_OF_FREEDOM, indexing='ij')
+_T_PPF_TABLE = dict(zip(zip(_t_table_levels.ravel().tolist(), _t_table_df.ravel().tolist()),
+                        special.stdtrit(_t_table_df, _t_table_levels).ravel().tolist()))
+
+
+# Coefficients of Acklam's rational approximation of the normal quantile function (relative error below 1.2e-9
+# before refinement).
+_ACKLAM_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02, 1.383577518672690e+02,
+             -3.066479806614716e+01, 2.506628277459239e+00)
+_ACKLAM_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02, 6.680131188771972e+01,
+             -1.328068155288572e+01)
+_ACKLAM_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00, -2.549732539343734e+00,
+             4.374664141464968e+00, 2.938163982698783e+00)
+_ACKLAM_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00)
+_ACKLAM_LOW = 0.02425
+
+_SQRT_2 = math.sqrt(2)
+_SQRT_2PI = math.sqrt(2 * math.pi)
+
+
+def _is_scalar(*args):
+    return all(isinstance(x, (int, float)) or np.ndim(x) == 0 for x in args)
+
+
+def _norm_lower_ppf(q):
+    """
+    Scalar normal quantile for q <= 0.5 without scipy: Acklam's approximation followed by one Halley step on the
+    erfc-based CDF, which brings it to double precision. Working in the lower tail keeps the precision of small q.
+    """
+    if q < _ACKLAM_LOW:
+        t = math.sqrt(-2 * math.log(q))
+        c, d = _ACKLAM_C, _ACKLAM_D
+        x = ((((((c[0] * t + c[1]) * t + c[2]) * t + c[3]) * t + c[4]) * t + c[5]) /
+             ((((d[0] * t + d[1]) * t + d[2]) * t + d[3]) * t + 1))
+    else:
+        r = q - 0.5
+        s = r * r
+        a, b = _ACKLAM_A, _ACKLAM_B
+        x = ((((((a[0] * s + a[1]) * s + a[2]) * s + a[3]) * s + a[4]) * s + a[5]) * r /
+             (((((b[0] * s + b[1]) * s + b[2]) * s + b[3]) * s + b[4]) * s + 1))
+
+    # Halley step: u = (cdf(x) - q) / pdf(x), written relative to q so that exp() does not overflow in the far tail.
+    u = (0.5 * math.erfc(-x / _SQRT_2) / q - 1) * _SQRT_2PI * math.exp(math.log(q) + x * x / 2)
+    return x - u / (1 + x * u / 2)
+
+
+def _norm_ppf_scalar(q):
+    if not 0 < q < 1:
+        return -math.inf if q == 0 else math.inf if q == 1 else math.nan
+    return _norm_lower_ppf(q) if q <= 0.5 else -_norm_lower_ppf(1 - q)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _norm_ppf_cached(q):
+    return _norm_ppf_scalar(q)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _t_ppf_cached(q, df):
+    return float(special.stdtrit(df, q))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _beta_ppf_cached(q, a, b):
+    return float(special.betaincinv(a, b, q))
+
+
+def norm_ppf(q):
+    """
+    Quantile function of the standard normal distribution. Scalars are looked up in the precomputed table of common
+    levels, then in a bounded memo cache, and are otherwise computed in pure Python; arrays go straight to the
+    scipy.special ufunc.
+
+    :param q: (float or array_like) The lower-tail probability
+
+    :return: (float or ndarray) The quantile(s)
+    """
+    if _is_scalar(q):
+        q = float(q)
+        value = _NORM_PPF_TABLE.get(q)
+        return value if value is not None else _norm_ppf_cached(q)
+    return special.ndtri(q)
+
+
+def norm_isf(q):
+    """
+    Inverse survival function of the standard normal distribution, the x with P(Z > x) = q. Unlike norm_ppf(1 - q)
+    it keeps full precision for the tiny upper-tail probabilities of large test statistics.
+
+    :param q: (float or array_like) The upper-tail probability
+
+    :return: (float or ndarray) The quantile(s)
+    """
+    if _is_scalar(q):
+        return -norm_ppf(q)
+    return -special.ndtri(q)
+
+
+def norm_cdf(x):
+    """
+    Cumulative distribution function of the standard normal distribution. Scalars use math.erfc, without any scipy
+    dispatch; arrays go to the scipy.special ufunc.
+
+    :param x: (float or array_like) The value(s)
+
+    :return: (float or ndarray) The lower-tail probability
+    """
+    if _is_scalar(x):
+        return 0.5 * math.erfc(-x / _SQRT_2)
+    return special.ndtr(x)
+
+
+def norm_sf(x):
+    """
+    Survival function (1 - CDF) of the standard normal distribution. It is computed directly rather than as
+    1 - norm_cdf(x), so upper-tail p-values of large statistics do not round to zero. Scalars use math.erfc; arrays
+    go to the scipy.special ufunc.
+
+    :param x: (float or array_like) The value(s)
+
+    :return: (float or ndarray) The upper-tail probability
+    """
+    if _is_scalar(x):
+        return 0.5 * math.erfc(x / _SQRT_2)
+    return special.ndtr(-np.asarray(x))
+
+
+def t_ppf(q, df):
+    """
+    Quantile function of Student's t distribution. Scalars are looked up in the precomputed table of common levels
+    and degrees of freedom, then in a bounded memo cache; arrays go straight to the scipy.special ufunc.
+
+    :param q: (float or array_like) The lower-tail probability
+    :param df: (int or array_like) The degrees of freedom
+
+    :return: (float or ndarray) The quantile(s)
+    """
+    if _is_scalar(q, df):
+        q, df = float(q), float(df)
+        value = _T_PPF_TABLE.get((q, df))
+        return value if value is not None else _t_ppf_cached(q, df)
+    return special.stdtrit(df, q)
+
+
+def beta_ppf(q, a, b):
+    """
+    Quantile function of the beta distribution. Scalars are memoized in a bounded cache (the Clopper-Pearson bounds
+    are called with the same few integer shape parameters over and over); arrays go straight to the scipy.special
+    ufunc.
+
+    :param q: (float or array_like) The lower-tail probability
+    :param a: (float or array_like) The first shape parameter
+    :param b: (float or array_like) The second shape parameter
+
+    :return: (float or ndarray) The quantile(s), NaN where a or b is not positive
+    """
+    if _is_scalar(q, a, b):
+        return _beta_ppf_cached(float(q), float(a), float(b))
+    return special.betaincinv(a, b, q)
+
+
+def chi2_sf(x, df):
+    """
+    Survival function (1 - CDF) of the chi-square distribution. The statistic changes from call to call, so there is
+    nothing to memoize; the speed-up comes from calling the scipy.special ufunc directly, and the survival function
+    keeps its precision far in the upper tail where 1 - cdf rounds to zero.
+
+    :param x: (float or array_like) The chi-square statistic(s)
+    :param df: (int or array_like) The degrees of freedom
+
+    :return: (float or ndarray) The upper-tail probability
+    """
+    if _is_scalar(x, df):
+        return float(special.chdtrc(df, x))
+    return special.chdtrc(df, x)
+
+
+def clear_cache():
+    """
+    Empty the memo caches (the precomputed tables are kept).
+    """
+    _norm_ppf_cached.cache_clear()
+    _t_ppf_cached.cache_clear()
+    _beta_ppf_cached.cache_clear()
@@ -1,5 +1,33 @@
 import numpy as np
 import scipy.stats as stats
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from scipy import sparse
+from scipy.special import gammaln, xlogy
+from critical_values import norm_ppf, norm_cdf, norm_sf, chi2_sf
+
+
+def validate_count_arrays(successes, trials):
+    """
+    Validate arrays of success and trial counts with vectorized checks, without converting them element by element.
+
+    :param successes: (array_like) The number of successes for each group
+    :param trials: (array_like) The number of trials for each group
+
+    :return: (tuple) The successes and trials as broadcast integer ndarrays
+    """
+    successes = np.asarray(successes)
+    trials = np.asarray(trials)
+    if successes.dtype.kind not in 'iu' or trials.dtype.kind not in 'iu':
+        raise ValueError("successes and trials must be arrays of integers.")
+    try:
+        successes, trials = np.broadcast_arrays(successes, trials)
+    except ValueError:
+        raise ValueError("successes and trials must have the same shape.")
+    if np.any(successes < 0) or np.any(successes > trials):
+        raise ValueError("successes must be between 0 and trials (inclusive).")
+
+    return successes, trials
 
 
 def proportion_z_test(successes1, trials1, successes2, trials2, alternative='two-sided'):
@@ -35,16 +63,74 @@ def proportion_z_test(successes1, trials1, successes2, trials2, alternative='two
     # print("z_stat", z_stat)
 
     if alternative == 'two-sided':
-        p_value = 2 * (1 - stats.norm.cdf(abs(z_stat)))
+        p_value = 2 * norm_sf(abs(z_stat))
     elif alternative == 'greater':
-        p_value = 1 - stats.norm.cdf(z_stat)
+        p_value = norm_sf(z_stat)
     elif alternative == 'less':
-        p_value = stats.norm.cdf(z_stat)
+        p_value = norm_cdf(z_stat)
     else:
         raise ValueError("Invalid alternative hypothesis. Choose from 'two-sided', 'greater', or 'less'.")
     return p_value
 
 
+def _z_test_p_values(z_stat, alternative):
+    """
+    Convert an array of z statistics to p-values for the given alternative hypothesis.
+    """
+    if alternative == 'two-sided':
+        return 2 * norm_sf(np.abs(z_stat))
+    elif alternative == 'greater':
+        return norm_sf(z_stat)
+    elif alternative == 'less':
+        return norm_cdf(z_stat)
+    raise ValueError("Invalid alternative hypothesis. Choose from 'two-sided', 'greater', or 'less'.")
+
+
+def _two_sample_count_arrays(successes1, trials1, successes2, trials2):
+    """
+    Validate and broadcast the counts of both groups of a batch of two-sample comparisons.
+    """
+    successes1, trials1 = validate_count_arrays(successes1, trials1)
+    successes2, trials2 = validate_count_arrays(successes2, trials2)
+    try:
+        return np.broadcast_arrays(successes1, trials1, successes2, trials2)
+    except ValueError:
+        raise ValueError("The counts of both groups must have the same shape.")
+
+
+def proportion_z_test_batch(successes1, trials1, successes2, trials2, alternative='two-sided'):
+    """
+    Perform proportion z-tests for many pairs of binomial proportions at once. This is the vectorized form of
+    proportion_z_test: all comparisons are computed in one NumPy pass. Degenerate rows (a group without trials, or a
+    pooled proportion of 0 or 1, where the standard error is zero) do not raise; they get NaN statistics and are
+    flagged in the returned mask.
+
+    :param successes1: (array_like) The number of successes in group 1 of each comparison
+    :param trials1: (array_like) The total number of trials in group 1 of each comparison
+    :param successes2: (array_like) The number of successes in group 2 of each comparison
+    :param trials2: (array_like) The total number of trials in group 2 of each comparison
+    :param alternative: (str) The alternative hypothesis, 'two-sided', 'greater', or 'less' (default is 'two-sided')
+
+    :return: (tuple) A tuple containing the z statistics (ndarray), the p-values (ndarray) and the mask of degenerate
+             rows (ndarray of bool)
+    """
+    if alternative not in ['two-sided', 'greater', 'less']:
+        raise ValueError("Invalid alternative hypothesis. Choose from 'two-sided', 'greater', or 'less'.")
+    successes1, trials1, successes2, trials2 = _two_sample_count_arrays(successes1, trials1, successes2, trials2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p1 = successes1 / trials1
+        p2 = successes2 / trials2
+        pooled_p = (successes1 + successes2) / (trials1 + trials2)
+        standard_error = np.sqrt(pooled_p * (1 - pooled_p) * (1 / trials1 + 1 / trials2))
+        z_stat = (p1 - p2) / standard_error
+
+    degenerate = (trials1 == 0) | (trials2 == 0) | ~(standard_error > 0)
+    z_stat = np.where(degenerate, np.nan, z_stat)
+
+    return z_stat, _z_test_p_values(z_stat, alternative), degenerate
+
+
 def power_analysis_binomial_proportions(p1, p2, alpha=0.05, power=0.8, alternative='two-sided', ratio=1):
     """
     Perform a power analysis for a proportion z-test comparing two binomial proportions to determine the required
@@ -71,18 +157,161 @@ def power_analysis_binomial_proportions(p1, p2, alpha=0.05, power=0.8, alternati
     standard_error = np.sqrt(pooled_p * (1 - pooled_p) * (1 + 1 / ratio))
 
     if alternative == 'two-sided':
-        z_alpha = stats.norm.ppf(1 - alpha / 2)
+        z_alpha = norm_ppf(1 - alpha / 2)
     elif alternative == 'greater' or alternative == 'less':
-        z_alpha = stats.norm.ppf(1 - alpha)
+        z_alpha = norm_ppf(1 - alpha)
     else:
         raise ValueError("Invalid alternative hypothesis. Choose from 'two-sided', 'greater', or 'less'.")
 
-    z_power = stats.norm.ppf(power)
+    z_power = norm_ppf(power)
     sample_size1 = ((z_alpha + z_power) * standard_error / (p1 - p2)) ** 2
 
     return int(np.ceil(sample_size1))
 
 
+def _power_analysis_arrays(alternative, ratio, **probabilities):
+    """
+    Validate the inputs shared by the vectorized power analysis functions and return the critical value of the test.
+
+    :param alternative: (str) The alternative hypothesis, 'two-sided', 'greater', or 'less'
+    :param ratio: (array_like) The ratio of sample sizes between group 2 and group 1
+    :param probabilities: (array_like) Named arrays that must lie between 0 and 1, alpha among them
+
+    :return: (tuple) The critical value z_alpha (ndarray), the ratio (ndarray) and the probability arrays (list)
+    """
+    arrays = [np.asarray(value, dtype=np.float64) for value in probabilities.values()]
+    if any(np.any(~((array >= 0) & (array <= 1))) for array in arrays):
+        raise ValueError(", ".join(probabilities) + " must be between 0 and 1 (inclusive).")
+    ratio = np.asarray(ratio, dtype=np.float64)
+    if np.any(~(ratio > 0)):
+        raise ValueError("ratio must be positive.")
+
+    alpha = arrays[list(probabilities).index('alpha')]
+    if alternative == 'two-sided':
+        z_alpha = norm_ppf(1 - alpha / 2)
+    elif alternative == 'greater' or alternative == 'less':
+        z_alpha = norm_ppf(1 - alpha)
+    else:
+        raise ValueError("Invalid alternative hypothesis. Choose from 'two-sided', 'greater', or 'less'.")
+
+    return z_alpha, ratio, arrays
+
+
+def _unit_standard_error(p1, p2, ratio):
+    """
+    The standard error of p1 - p2 used by power_analysis_binomial_proportions, for one observation in group 1.
+    """
+    pooled_p = (p1 + ratio * p2) / (1 + ratio)
+    return np.sqrt(pooled_p * (1 - pooled_p) * (1 + 1 / ratio))
+
+
+def power_analysis_binomial_proportions_batch(p1, p2, alpha=0.05, power=0.8, alternative='two-sided', ratio=1):
+    """
+    Determine the required sample size of a proportion z-test for whole grids of scenarios at once. This is the
+    vectorized form of power_analysis_binomial_proportions: p1, p2, alpha, power and ratio are broadcast against each
+    other, so e.g. p1[:, None] and p2[None, :] give the sample size for every pair of proportions in one call.
+
+    :param p1: (array_like) The true proportion in group 1
+    :param p2: (array_like) The true proportion in group 2
+    :param alpha: (array_like) The desired significance level (default is 0.05)
+    :param power: (array_like) The desired statistical power (default is 0.8)
+    :param alternative: (str) The alternative hypothesis, 'two-sided', 'greater', or 'less' (default is 'two-sided')
+    :param ratio: (array_like) The ratio of sample sizes between group 2 and group 1 (default is 1)
+
+    :return: (ndarray) The required sample size for group 1, inf where p1 equals p2
+    """
+    z_alpha, ratio, (p1, p2, alpha, power) = _power_analysis_arrays(alternative, ratio, p1=p1, p2=p2, alpha=alpha,
+                                                                    power=power)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sample_size1 = ((z_alpha + norm_ppf(power)) * _unit_standard_error(p1, p2, ratio) / (p1 - p2)) ** 2
+
+    return np.ceil(sample_size1)
+
+
+def power_binomial_proportions(p1, p2, sample_size1, alpha=0.05, alternative='two-sided', ratio=1):
+    """
+    Calculate the statistical power of a proportion z-test for a given sample size. This inverts
+    power_analysis_binomial_proportions under the same normal approximation (only the tail in the direction of the
+    difference counts towards the power of a two-sided test, and a one-sided test has power only when the difference
+    points in the direction of its alternative), and broadcasts over all of its inputs.
+
+    :param p1: (array_like) The true proportion in group 1
+    :param p2: (array_like) The true proportion in group 2
+    :param sample_size1: (array_like) The sample size of group 1
+    :param alpha: (array_like) The significance level (default is 0.05)
+    :param alternative: (str) The alternative hypothesis, 'two-sided', 'greater', or 'less' (default is 'two-sided')
+    :param ratio: (array_like) The ratio of sample sizes between group 2 and group 1 (default is 1)
+
+    :return: (float or ndarray) The statistical power
+    """
+    z_alpha, ratio, (p1, p2, alpha) = _power_analysis_arrays(alternative, ratio, p1=p1, p2=p2, alpha=alpha)
+    sample_size1 = np.asarray(sample_size1, dtype=np.float64)
+    if np.any(~(sample_size1 > 0)):
+        raise ValueError("sample_size1 must be positive.")
+
+    # A one-sided test only has power in the direction of its alternative ('greater': p1 > p2, 'less': p1 < p2).
+    if alternative == 'greater':
+        difference = p1 - p2
+    elif alternative == 'less':
+        difference = p2 - p1
+    else:
+        difference = np.abs(p1 - p2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_power = difference * np.sqrt(sample_size1) / _unit_standard_error(p1, p2, ratio) - z_alpha
+
+    return norm_cdf(z_power)
+
+
+def minimum_detectable_effect_binomial_proportions(p1, sample_size1, alpha=0.05, power=0.8, alternative='two-sided',
+                                                   ratio=1, tolerance=1e-10):
+    """
+    Calculate the smallest difference |p2 - p1| that a proportion z-test detects with the desired power for a given
+    sample size. For 'less' the search is over p2 > p1, for 'greater' over p2 < p1, and for 'two-sided' the smaller of
+    the two directions is returned. The required effect is the root of a convex function of the difference, so a
+    vectorized bisection over all grid points at once finds it.
+
+    :param p1: (array_like) The baseline proportion in group 1
+    :param sample_size1: (array_like) The sample size of group 1
+    :param alpha: (array_like) The desired significance level (default is 0.05)
+    :param power: (array_like) The desired statistical power (default is 0.8)
+    :param alternative: (str) The alternative hypothesis, 'two-sided', 'greater', or 'less' (default is 'two-sided')
+    :param ratio: (array_like) The ratio of sample sizes between group 2 and group 1 (default is 1)
+    :param tolerance: (float) The absolute tolerance of the returned effect (default is 1e-10)
+
+    :return: (float or ndarray) The minimum detectable effect, NaN where no p2 in [0, 1] reaches the power
+    """
+    z_alpha, ratio, (p1, alpha, power) = _power_analysis_arrays(alternative, ratio, p1=p1, alpha=alpha, power=power)
+    sample_size1 = np.asarray(sample_size1, dtype=np.float64)
+    if np.any(~(sample_size1 > 0)):
+        raise ValueError("sample_size1 must be positive.")
+
+    z_total = z_alpha + norm_ppf(power)
+    p1, sample_size1, z_total, ratio = np.broadcast_arrays(p1, sample_size1, z_total, ratio)
+    directions = {'less': [1.0], 'greater': [-1.0], 'two-sided': [1.0, -1.0]}[alternative]
+    n_iterations = int(np.ceil(np.log2(1 / tolerance)))
+
+    effects = []
+    for direction in directions:
+        # shortfall(d) = d * sqrt(n) - (z_alpha + z_power) * SE(p1 + direction * d) is convex in d and not positive
+        # at d = 0, so it changes sign at most once on [0, d_max].
+        def shortfall(effect):
+            return effect * np.sqrt(sample_size1) - z_total * _unit_standard_error(p1, p1 + direction * effect, ratio)
+
+        low = np.zeros_like(p1)
+        high = 1 - p1 if direction > 0 else p1.copy()
+        reachable = (high > 0) & (shortfall(high) >= 0)
+        for _ in range(n_iterations):
+            middle = (low + high) / 2
+            above = shortfall(middle) >= 0
+            high = np.where(above, middle, high)
+            low = np.where(above, low, middle)
+        effects.append(np.where(reachable, high, np.nan))
+
+    effect = effects[0] if len(effects) == 1 else np.fmin(effects[0], effects[1])
+
+    return float(effect) if effect.ndim == 0 else effect
+
+
 def fishers_exact_test(success1, total1, success2, total2, alternative='two-sided'):
     """
     Perform Fisher's exact test for equality of two binomial proportions. This function performs Fisher's exact test
@@ -111,84 +340,577 @@ def fishers_exact_test(success1, total1, success2, total2, alternative='two-side
     return p_value
 
 
-def chi_square_test(binomial_data, expected_proportions=None):
+# The log-factorial table of a worker process of fishers_exact_test_batch, built once by _init_fisher_worker.
+_worker_log_factorial = None
+
+
+def _init_fisher_worker(max_total):
     """
-    Perform a chi-square test for the equality of multiple binomial proportions. This function performs a chi-square
-    test for the equality of multiple binomial proportions. It takes a list of tuples containing the number of
-    successes and total trials for each group, and optionally, a list of expected proportions for each group. If not
-    provided, the test assumes equal proportions. The function returns the p-value for the test.
+    Build the log-factorial table up to the largest total once per worker process, instead of once per chunk.
+    """
+    global _worker_log_factorial
+    _worker_log_factorial = gammaln(np.arange(max_total + 1) + 1)
 
-    :param binomial_data: (list) A list of tuples containing the number of successes and total trials for each group
-    :param expected_proportions: (list, optional) A list of expected proportions for each group. If not provided, the
-                                  test will assume equal proportions.
 
-    :return: (float) The p-value for the test
+def _fisher_exact_chunk(task):
+    """
+    Fisher's exact test p-values for a chunk of 2x2 tables, vectorized over the padded hypergeometric support of all
+    tables in the chunk. Module level so that it can be sent to worker processes, where the table is None and the
+    worker's own table is used.
+    """
+    success1, total1, success2, total2, alternative, log_factorial = task
+    if log_factorial is None:
+        log_factorial = _worker_log_factorial
+
+    successes = success1 + success2
+    total = total1 + total2
+    lower = np.maximum(0, successes - total2)
+    upper = np.minimum(total1, successes)
+
+    support = lower[:, None] + np.arange(np.max(upper - lower, initial=0) + 1)[None, :]
+    in_support = support <= upper[:, None]
+    support = np.minimum(support, upper[:, None])
+
+    log_pmf = (log_factorial[successes] + log_factorial[total - successes] + log_factorial[total1]
+               + log_factorial[total2] - log_factorial[total])[:, None] - (
+        log_factorial[support] + log_factorial[successes[:, None] - support]
+        + log_factorial[total1[:, None] - support] + log_factorial[total2[:, None] - successes[:, None] + support])
+    pmf = np.where(in_support, np.exp(log_pmf), 0.0)
+
+    if alternative == 'less':
+        p_value = np.sum(np.where(support <= success1[:, None], pmf, 0.0), axis=1)
+    elif alternative == 'greater':
+        p_value = np.sum(np.where(support >= success1[:, None], pmf, 0.0), axis=1)
+    else:
+        # Two-sided: sum the probabilities of all tables at most as likely as the observed one. The relative
+        # tolerance absorbs rounding in the log-factorial differences so that exactly tied tables are included.
+        observed = np.take_along_axis(pmf, (success1 - lower)[:, None], axis=1)
+        p_value = np.sum(np.where(pmf <= observed * (1 + 1e-7), pmf, 0.0), axis=1)
+
+    return np.minimum(p_value, 1.0)
+
+
+def fishers_exact_test_batch(success1, total1, success2, total2, alternative='two-sided', n_workers=1,
+                             max_cells=2 ** 22):
+    """
+    Perform Fisher's exact test for many 2x2 tables at once. A log-factorial table is built once up to the largest
+    total (once per worker process with n_workers > 1), and the hypergeometric tail sums of all tables are computed together over their padded supports, in
+    chunks of at most max_cells support cells. Tables whose support alone exceeds max_cells are handed to
+    scipy.stats.fisher_exact one by one. Tables with a group without trials get NaN, as in fishers_exact_test, and
+    tables with an empty column get a p-value of 1, as in scipy.
+
+    :param success1: (array_like) The number of successes in group 1 of each table
+    :param total1: (array_like) The total number of trials in group 1 of each table
+    :param success2: (array_like) The number of successes in group 2 of each table
+    :param total2: (array_like) The total number of trials in group 2 of each table
+    :param alternative: (str) The alternative hypothesis, 'two-sided', 'greater', or 'less' (default is 'two-sided')
+    :param n_workers: (int) The number of worker processes to split the chunks over (default is 1)
+    :param max_cells: (int) The largest number of support cells evaluated at once per chunk (default is 2 ** 22)
+
+    :return: (ndarray) The p-values for the tests
+    """
+    if alternative not in ['two-sided', 'greater', 'less']:
+        raise ValueError("Invalid alternative hypothesis. Choose from 'two-sided', 'greater', or 'less'.")
+    if not isinstance(n_workers, int) or n_workers < 1:
+        raise ValueError("n_workers must be a positive integer.")
+    success1, total1, success2, total2 = _two_sample_count_arrays(success1, total1, success2, total2)
+
+    shape = success1.shape
+    success1, total1, success2, total2 = (np.ravel(x).astype(np.int64) for x in (success1, total1, success2, total2))
+    p_value = np.full(success1.size, np.nan)
+
+    width = np.minimum(total1, success1 + success2) - np.maximum(0, success1 + success2 - total2) + 1
+    valid = (total1 > 0) & (total2 > 0)
+    large = valid & (width > max_cells)
+    for i in np.flatnonzero(large):
+        p_value[i] = stats.fisher_exact([[success1[i], total1[i] - success1[i]],
+                                         [success2[i], total2[i] - success2[i]]], alternative=alternative)[1]
+
+    # Group tables of similar support width so that padding stays small, then cut chunks of at most max_cells.
+    rows = np.flatnonzero(valid & ~large)
+    rows = rows[np.argsort(width[rows], kind='stable')]
+    chunks = []
+    start = 0
+    while start < rows.size:
+        end = min(rows.size, start + max(1, max_cells // width[rows[start]]))
+        while end - start > 1 and (end - start) * width[rows[end - 1]] > max_cells:
+            end = start + (end - start) // 2
+        chunks.append(rows[start:end])
+        start = end
+
+    if n_workers == 1:
+        log_factorial = gammaln(np.arange(np.max(total1 + total2, initial=0) + 1) + 1)
+        tasks = [(success1[c], total1[c], success2[c], total2[c], alternative, log_factorial) for c in chunks]
+        results = [_fisher_exact_chunk(task) for task in tasks]
+    else:
+        tasks = [(success1[c], total1[c], success2[c], total2[c], alternative, None) for c in chunks]
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_fisher_worker,
+                                 initargs=(int(np.max(total1 + total2, initial=0)),)) as executor:
+            results = list(executor.map(_fisher_exact_chunk, tasks))
+
+    for chunk, result in zip(chunks, results):
+        p_value[chunk] = result
+    p_value[valid & ((success1 + success2 == 0) | (success1 + success2 == total1 + total2))] = 1.0
+
+    return p_value.reshape(shape)
+
+
+def _binomial_data_arrays(binomial_data, successes, trials):
+    """
+    Turn the group counts given to chi_square_test or g_test_goodness_of_fit into arrays of successes and trials. A
+    (k, 2) ndarray is split into column views and separate arrays are used as they are, so neither is copied; the
+    list of tuples is converted in a single call.
+
+    :param binomial_data: (list or ndarray) A list of (successes, trials) tuples or a (k, 2) integer array, or None
+    :param successes: (array_like) The number of successes for each group, if binomial_data is None
+    :param trials: (array_like) The number of trials for each group, if binomial_data is None
+
+    :return: (tuple) The successes and trials as 1-D ndarrays
     """
+    if binomial_data is None:
+        if successes is None or trials is None:
+            raise ValueError("Provide either binomial_data or both successes and trials.")
+        successes, trials = validate_count_arrays(successes, trials)
+        if successes.ndim != 1:
+            raise ValueError("successes and trials must be one-dimensional.")
+        return successes, trials
+    if successes is not None or trials is not None:
+        raise ValueError("Provide either binomial_data or successes and trials, not both.")
+
+    if isinstance(binomial_data, np.ndarray):
+        if binomial_data.ndim != 2 or binomial_data.shape[1] != 2:
+            raise ValueError("binomial_data must be a (k, 2) array of successes and trials.")
+        return validate_count_arrays(binomial_data[:, 0], binomial_data[:, 1])
+
     if not isinstance(binomial_data, list) or not all(
             isinstance(x, tuple) and len(x) == 2 and all(isinstance(y, int) for y in x) for x in binomial_data):
         raise ValueError("binomial_data must be a list of tuples, each containing two integers.")
-    if expected_proportions is not None:
+    data = np.array(binomial_data).reshape(-1, 2)
+
+    return data[:, 0], data[:, 1]
+
+
+def _expected_proportions_array(expected_proportions, n_groups, check_sum=False):
+    """
+    Validate the expected proportions given to chi_square_test or g_test_goodness_of_fit. Lists are checked element by
+    element as before; ndarrays are checked with vectorized comparisons.
+
+    :param expected_proportions: (list or ndarray) The expected proportion of each group, or None for equal proportions
+    :param n_groups: (int) The number of groups
+    :param check_sum: (bool, optional) Whether the proportions must lie in [0, 1] and sum up to 1 (default is False)
+
+    :return: (ndarray or float) The expected proportions, or the common proportion 1 / n_groups
+    """
+    if expected_proportions is None:
+        return 1 / n_groups
+
+    if isinstance(expected_proportions, np.ndarray):
+        if expected_proportions.ndim != 1 or expected_proportions.dtype.kind not in 'iuf':
+            raise ValueError("expected_proportions must be a list of numbers (integers or floats).")
+        if check_sum and not (np.sum(expected_proportions) == 1 and
+                              np.all((expected_proportions >= 0) & (expected_proportions <= 1))):
+            raise ValueError("expected_proportions must be non-negative and sum up to 1.")
+    else:
         if not isinstance(expected_proportions, list) or not all(
                 isinstance(x, (int, float)) for x in expected_proportions):
             raise ValueError("expected_proportions must be a list of numbers (integers or floats).")
+        if check_sum and not (sum(expected_proportions) == 1 and all(0 <= x <= 1 for x in expected_proportions)):
+            raise ValueError("expected_proportions must be non-negative and sum up to 1.")
 
-    observed_successes = np.array([x[0] for x in binomial_data])
-    total_trials = np.array([x[1] for x in binomial_data])
+    if len(expected_proportions) != n_groups:
+        raise ValueError("Number of expected proportions must match the number of binomial data groups.")
 
-    if expected_proportions is None:
-        expected_proportions = np.full(len(binomial_data), 1 / len(binomial_data))
+    return np.asarray(expected_proportions, dtype=np.float64)
 
-    if len(expected_proportions) != len(binomial_data):
-        raise ValueError("Number of expected proportions must match the number of binomial data groups.")
+
+def chi_square_test(binomial_data=None, expected_proportions=None, successes=None, trials=None):
+    """
+    Perform a chi-square test for the equality of multiple binomial proportions. This function performs a chi-square
+    test for the equality of multiple binomial proportions. It takes a list of tuples containing the number of
+    successes and total trials for each group, and optionally, a list of expected proportions for each group. If not
+    provided, the test assumes equal proportions. The function returns the p-value for the test. The groups can also
+    be given as a (k, 2) NumPy array or as separate successes and trials arrays, which are validated with vectorized
+    checks and used without copying.
+
+    :param binomial_data: (list or ndarray) A list of tuples containing the number of successes and total trials for
+                          each group, or a (k, 2) integer array with the same columns
+    :param expected_proportions: (list or ndarray, optional) A list of expected proportions for each group. If not
+                                  provided, the test will assume equal proportions.
+    :param successes: (array_like, optional) The number of successes for each group, used instead of binomial_data
+    :param trials: (array_like, optional) The number of trials for each group, used instead of binomial_data
+
+    :return: (float) The p-value for the test
+    """
+    observed_successes, total_trials = _binomial_data_arrays(binomial_data, successes, trials)
+    expected_proportions = _expected_proportions_array(expected_proportions, observed_successes.size)
 
     total_successes = np.sum(observed_successes)
-    expected_successes = total_successes * np.array(expected_proportions)
+    expected_successes = total_successes * expected_proportions
     chi_square_statistic = np.sum(((observed_successes - expected_successes) ** 2) / expected_successes)
-    degrees_of_freedom = len(binomial_data) - 1
-    p_value = 1 - stats.chi2.cdf(chi_square_statistic, degrees_of_freedom)
+    degrees_of_freedom = observed_successes.size - 1
+    p_value = chi2_sf(chi_square_statistic, degrees_of_freedom)
 
     return p_value
 
 
-def g_test_goodness_of_fit(binomial_data, expected_proportions=None):
+def g_test_goodness_of_fit(binomial_data=None, expected_proportions=None, successes=None, trials=None):
     """
     Perform a G-test for goodness-of-fit for binomial data. This function performs a G-test for goodness-of-fit for
     binomial data. It takes a list of tuples containing the number of successes and total trials for each group,
     and optionally, a list of expected proportions for each group. If not provided, the test assumes equal
-    proportions. The function returns the p-value for the test.
+    proportions. The function returns the p-value for the test. The groups can also be given as a (k, 2) NumPy array
+    or as separate successes and trials arrays, which are validated with vectorized checks and used without copying.
 
-    :param binomial_data: (list) A list of tuples containing the number of successes and total trials for each group
-    :param expected_proportions: (list, optional) A list of expected proportions for each group. If not provided, the
-                                  test will assume equal proportions.
+    :param binomial_data: (list or ndarray) A list of tuples containing the number of successes and total trials for
+                          each group, or a (k, 2) integer array with the same columns
+    :param expected_proportions: (list or ndarray, optional) A list of expected proportions for each group. If not
+                                  provided, the test will assume equal proportions.
+    :param successes: (array_like, optional) The number of successes for each group, used instead of binomial_data
+    :param trials: (array_like, optional) The number of trials for each group, used instead of binomial_data
 
     :return: (float) The p-value for the test
     """
-    if not isinstance(binomial_data, list) or not all(
-            isinstance(x, tuple) and len(x) == 2 and all(isinstance(y, int) for y in x) for x in binomial_data):
-        raise ValueError("binomial_data must be a list of tuples, each containing two integers.")
-    if expected_proportions is not None:
-        if not isinstance(expected_proportions, list) or not all(
-                isinstance(x, (int, float)) for x in expected_proportions):
-            raise ValueError("expected_proportions must be a list of numbers (integers or floats).")
-        if not (sum(expected_proportions) == 1 and all(0 <= x <= 1 for x in expected_proportions)):
+    observed_successes, total_trials = _binomial_data_arrays(binomial_data, successes, trials)
+    expected_proportions = _expected_proportions_array(expected_proportions, observed_successes.size, check_sum=True)
+
+    total_successes = np.sum(observed_successes)
+    expected_successes = total_successes * expected_proportions
+    # xlogy makes empty groups contribute 0 instead of 0 * log(0) = NaN.
+    g_statistic = 2 * np.sum(xlogy(observed_successes, observed_successes / expected_successes))
+    degrees_of_freedom = observed_successes.size - 1
+    p_value = chi2_sf(g_statistic, degrees_of_freedom)
+
+    return p_value
+
+
+def _sparse_count_chunks(counts, n_categories, chunk_size):
+    """
+    Turn the sparse counts given to chi_square_test_sparse or g_test_sparse into a stream of (indices, counts) chunks.
+
+    :param counts: (sparse matrix, tuple or iterable) A scipy.sparse vector, an (indices, counts) tuple, or an
+                   iterable of (indices, counts) tuples
+    :param n_categories: (int) The number of categories, or None to take it from the sparse vector's shape
+    :param chunk_size: (int) The number of nonzero cells per chunk for sparse vectors and tuples
+
+    :return: (tuple) The number of categories and an iterator over (indices, counts) chunks
+    """
+    if sparse.issparse(counts):
+        if min(counts.shape) != 1:
+            raise ValueError("The sparse counts must be a vector (a single row or column).")
+        coo = sparse.coo_matrix(counts)
+        coo.sum_duplicates()
+        n_categories = max(counts.shape) if n_categories is None else n_categories
+        counts = (coo.col if counts.shape[0] == 1 else coo.row, coo.data)
+    if n_categories is None or not isinstance(n_categories, (int, np.integer)) or n_categories < 2:
+        raise ValueError("n_categories must be an integer of at least 2.")
+
+    if isinstance(counts, tuple):
+        indices, values = np.asarray(counts[0]), np.asarray(counts[1])
+        if indices.shape != values.shape:
+            raise ValueError("indices and counts must have the same shape.")
+        chunks = ((indices[start:start + chunk_size], values[start:start + chunk_size])
+                  for start in range(0, indices.size, chunk_size))
+    else:
+        chunks = counts
+
+    return n_categories, chunks
+
+
+def _sparse_test_statistic(counts, n_categories, expected_proportions, chunk_size, statistic):
+    """
+    Stream the chi-square or G statistic over the nonzero cells of sparse counts. Since the expected counts are N * p
+    and sum up to N, chi-square = sum(o ** 2 / (N * p)) - N and G = 2 * (sum(o * log(o / p)) - N * log(N)), so only
+    the expected proportions of the nonzero cells are ever looked up and N is only needed at the end.
+
+    :return: (tuple) The statistic and the degrees of freedom
+    """
+    n_categories, chunks = _sparse_count_chunks(counts, n_categories, chunk_size)
+    if expected_proportions is not None and not callable(expected_proportions):
+        expected_proportions = np.asarray(expected_proportions, dtype=np.float64)
+        if expected_proportions.shape != (n_categories,):
+            raise ValueError("Number of expected proportions must match the number of categories.")
+        if np.any(expected_proportions < 0) or not np.isclose(np.sum(expected_proportions), 1):
             raise ValueError("expected_proportions must be non-negative and sum up to 1.")
 
-    observed_successes = np.array([x[0] for x in binomial_data])
-    total_trials = np.array([x[1] for x in binomial_data])
+    n_total = 0
+    accumulated = 0.0
+    for indices, values in chunks:
+        indices, values = np.asarray(indices), np.asarray(values)
+        if indices.dtype.kind not in 'iu' or values.dtype.kind not in 'iuf':
+            raise ValueError("indices must be integers and counts must be numbers.")
+        if np.any((indices < 0) | (indices >= n_categories)):
+            raise ValueError("indices must be between 0 and n_categories - 1.")
+        if np.any(values < 0):
+            raise ValueError("counts must be non-negative.")
 
-    if expected_proportions is None:
-        expected_proportions = np.full(len(binomial_data), 1 / len(binomial_data))
+        if expected_proportions is None:
+            proportions = 1 / n_categories
+        elif callable(expected_proportions):
+            proportions = np.asarray(expected_proportions(indices), dtype=np.float64)
+        else:
+            proportions = expected_proportions[indices]
 
-    if len(expected_proportions) != len(binomial_data):
-        raise ValueError("Number of expected proportions must match the number of binomial data groups.")
+        n_total += values.sum()
+        with np.errstate(divide='ignore'):
+            if statistic == 'chi-square':
+                accumulated += np.sum(values.astype(np.float64) ** 2 / proportions)
+            else:
+                accumulated += np.sum(xlogy(values, values / proportions))
 
-    total_successes = np.sum(observed_successes)
-    expected_successes = total_successes * np.array(expected_proportions)
-    g_statistic = 2 * np.sum(observed_successes * np.log(observed_successes / expected_successes))
-    degrees_of_freedom = len(binomial_data) - 1
-    p_value = 1 - stats.chi2.cdf(g_statistic, degrees_of_freedom)
+    if n_total == 0:
+        return np.nan, n_categories - 1
+    if statistic == 'chi-square':
+        return accumulated / n_total - n_total, n_categories - 1
+    return 2 * (accumulated - xlogy(n_total, n_total)), n_categories - 1
+
+
+def chi_square_test_sparse(counts, n_categories=None, expected_proportions=None, chunk_size=2 ** 20):
+    """
+    Perform a chi-square goodness-of-fit test on sparse counts over a large number of categories. Only the nonzero
+    cells are visited, in chunks, using chi-square = sum(o ** 2 / e) - N over them, so neither the dense counts nor
+    the dense expected counts are ever built. Duplicate indices are summed for scipy.sparse input; in (indices,
+    counts) input every category may appear at most once.
+
+    :param counts: (sparse matrix, tuple or iterable) A scipy.sparse vector of counts, an (indices, counts) tuple of
+                   arrays, or an iterable of (indices, counts) chunks
+    :param n_categories: (int, optional) The number of categories, empty ones included. Taken from the shape of a
+                         scipy.sparse vector if not provided.
+    :param expected_proportions: (ndarray or callable, optional) The expected proportion of every category, or a
+                                 function that returns the expected proportions of an array of category indices. If
+                                 not provided, the test will assume equal proportions.
+    :param chunk_size: (int, optional) The number of nonzero cells per chunk (default is 2 ** 20)
+
+    :return: (float) The p-value for the test
+    """
+    chi_square_statistic, degrees_of_freedom = _sparse_test_statistic(counts, n_categories, expected_proportions,
+                                                                      chunk_size, 'chi-square')
+    return chi2_sf(chi_square_statistic, degrees_of_freedom)
+
+
+def g_test_sparse(counts, n_categories=None, expected_proportions=None, chunk_size=2 ** 20):
+    """
+    Perform a G-test for goodness-of-fit on sparse counts over a large number of categories. Empty categories
+    contribute 0 * log(0) = 0 and are skipped, so only the nonzero cells are visited, in chunks, and the dense
+    expected counts are never built. Duplicate indices are summed for scipy.sparse input; in (indices, counts) input
+    every category may appear at most once.
+
+    :param counts: (sparse matrix, tuple or iterable) A scipy.sparse vector of counts, an (indices, counts) tuple of
+                   arrays, or an iterable of (indices, counts) chunks
+    :param n_categories: (int, optional) The number of categories, empty ones included. Taken from the shape of a
+                         scipy.sparse vector if not provided.
+    :param expected_proportions: (ndarray or callable, optional) The expected proportion of every category, or a
+                                 function that returns the expected proportions of an array of category indices. If
+                                 not provided, the test will assume equal proportions.
+    :param chunk_size: (int, optional) The number of nonzero cells per chunk (default is 2 ** 20)
+
+    :return: (float) The p-value for the test
+    """
+    g_statistic, degrees_of_freedom = _sparse_test_statistic(counts, n_categories, expected_proportions, chunk_size,
+                                                             'g')
+    return chi2_sf(g_statistic, degrees_of_freedom)
+
+
+def _contingency_table_expected(table):
+    """
+    Validate an r x c contingency table, drop the rows and columns without any counts (they carry no information and
+    would have zero expected counts), and compute the expected counts under independence.
+
+    :param table: (array_like) The r x c table of counts
+
+    :return: (tuple) The observed counts, the expected counts (both ndarrays) and the degrees of freedom
+    """
+    table = np.asarray(table)
+    if table.ndim != 2 or table.dtype.kind not in 'iu' or np.any(table < 0):
+        raise ValueError("table must be a two-dimensional array of non-negative integers.")
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    if min(table.shape) < 2:
+        raise ValueError("table must have at least two non-empty rows and two non-empty columns.")
+
+    row_totals = table.sum(axis=1, keepdims=True)
+    column_totals = table.sum(axis=0, keepdims=True)
+    expected = row_totals * column_totals / table.sum()
+    degrees_of_freedom = (table.shape[0] - 1) * (table.shape[1] - 1)
+
+    return table, expected, degrees_of_freedom
+
+
+def chi_square_independence_test(table):
+    """
+    Perform a chi-square test of independence on an r x c contingency table, such as the one built by
+    read_file.read_contingency_table. Rows and columns without any counts are ignored.
+
+    :param table: (array_like) The r x c table of counts
+
+    :return: (float) The p-value for the test
+    """
+    observed, expected, degrees_of_freedom = _contingency_table_expected(table)
+    chi_square_statistic = np.sum((observed - expected) ** 2 / expected)
+
+    return chi2_sf(chi_square_statistic, degrees_of_freedom)
+
+
+def g_test_independence(table):
+    """
+    Perform a G-test of independence on an r x c contingency table. Empty cells contribute 0 to the statistic and
+    rows and columns without any counts are ignored.
+
+    :param table: (array_like) The r x c table of counts
+
+    :return: (float) The p-value for the test
+    """
+    observed, expected, degrees_of_freedom = _contingency_table_expected(table)
+    g_statistic = 2 * np.sum(xlogy(observed, observed / expected))
+
+    return chi2_sf(g_statistic, degrees_of_freedom)
+
+
+def cramers_v(table):
+    """
+    Calculate Cramer's V, the strength of the association in an r x c contingency table, from 0 (independence) to 1
+    (each row determines the column). Rows and columns without any counts are ignored.
+
+    :param table: (array_like) The r x c table of counts
+
+    :return: (float) Cramer's V
+    """
+    observed, expected, _ = _contingency_table_expected(table)
+    chi_square_statistic = np.sum((observed - expected) ** 2 / expected)
+
+    return float(np.sqrt(chi_square_statistic / (observed.sum() * (min(observed.shape) - 1))))
+
+
+# Relative tolerance of the "at most as likely" comparison of the two-sided binomial test, as in
+# scipy.stats.binomtest, so that outcomes whose probabilities differ only by rounding count as equally likely.
+_BINOMIAL_TEST_TOLERANCE = 1 + 1e-7
+# Two-sided tests against a Binomial(n, p0) with n up to _BINOMIAL_TABLE_MAX_N use a cached PMF table when the null
+# is shared by at least _BINOMIAL_TABLE_MIN_TESTS tests (or for a single test), which bounds the cache to about
+# 256 * 3 * 8 * _BINOMIAL_TABLE_MAX_N bytes. All other tests evaluate the PMF only at their binary search probes.
+_BINOMIAL_TABLE_MAX_N = 4096
+_BINOMIAL_TABLE_MIN_TESTS = 64
+
+
+@lru_cache(maxsize=256)
+def _binomial_test_table(n, p0):
+    """
+    PMF, CDF and survival function of Binomial(n, p0) over 0..n, and the mode, cached per (n, p0) so that repeated
+    tests against the same small null hypothesis only pay for the table once. The survival function is padded with a
+    trailing 0 for P(X >= n + 1).
+    """
+    outcomes = np.arange(n + 1)
+    pmf = stats.binom.pmf(outcomes, n, p0)
+    cdf = stats.binom.cdf(outcomes, n, p0)
+    sf = np.append(stats.binom.sf(outcomes - 1, n, p0), 0.0)
+    for table in (pmf, cdf, sf):
+        table.flags.writeable = False
+
+    return pmf, cdf, sf, int(np.argmax(pmf))
+
+
+def _two_sided_binomial_table(k, n, p0):
+    """
+    Two-sided p-values for an array of successes k against a single Binomial(n, p0), from the cached table.
+    """
+    pmf, cdf, sf, mode = _binomial_test_table(n, p0)
+
+    # Outcomes at most as likely as k on the other side of the mode form a tail there, because the PMF increases up
+    # to the mode and decreases after it. Its end is found by binary search instead of a scan.
+    threshold = pmf[k] * _BINOMIAL_TEST_TOLERANCE
+    first_upper = mode + np.searchsorted(-pmf[mode:], -threshold, side='left')
+    last_lower = np.searchsorted(pmf[:mode + 1], threshold, side='right') - 1
+    lower_tail = cdf[k] + sf[first_upper]
+    upper_tail = np.where(last_lower >= 0, cdf[np.maximum(last_lower, 0)], 0.0) + sf[k]
+    p_value = np.where(k < mode, lower_tail, np.where(k > mode, upper_tail, 1.0))
+
+    return np.minimum(p_value, 1.0)
 
-    return p_value
+
+def _two_sided_binomial_search(k, n, p0):
+    """
+    Two-sided p-values for 1-D arrays k, n and p0 without tables. The end of the tail on the other side of the mode is
+    found by a vectorized binary search over all tests at once, which evaluates the PMF only at the O(log n) probes.
+    """
+    mode = np.clip(np.ceil((n + 1) * p0) - 1, 0, n).astype(np.int64)
+    threshold = stats.binom.pmf(k, n, p0) * _BINOMIAL_TEST_TOLERANCE
+
+    # Search the first outcome of [low, high) where the monotone predicate holds: the PMF is at most the threshold
+    # on the decreasing side above the mode, and above it on the increasing side below the mode.
+    lower_side = k > mode
+    low = np.where(lower_side, 0, mode)
+    high = np.where(lower_side, mode + 1, n + 1)
+    active = np.flatnonzero((low < high) & (k != mode))
+    while active.size:
+        middle = (low[active] + high[active]) // 2
+        holds = ((stats.binom.pmf(middle, n[active], p0[active]) <= threshold[active]) !=
+                 lower_side[active])
+        high[active] = np.where(holds, middle, high[active])
+        low[active] = np.where(holds, low[active], middle + 1)
+        active = active[low[active] < high[active]]
+
+    # On the upper side low is the first outcome of the far tail, on the lower side low - 1 is its last one.
+    p_value = np.where(lower_side,
+                       stats.binom.cdf(low - 1, n, p0) + stats.binom.sf(k - 1, n, p0),
+                       stats.binom.cdf(k, n, p0) + stats.binom.sf(low - 1, n, p0))
+    p_value = np.where(k == mode, 1.0, p_value)
+
+    return np.minimum(p_value, 1.0)
+
+
+def binomial_test(k, n, p0=0.5, alternative='two-sided'):
+    """
+    Perform an exact binomial test of the null hypothesis that the probability of success is p0, for small samples
+    where the normal approximation of Variance_Testing.z_test is unreliable. The one-sided p-values are one
+    vectorized binomial CDF or survival function call. The two-sided p-value sums the outcomes at most as likely as
+    the observed one, whose extent on the far side of the mode is found by binary search: on a cached PMF table for
+    small nulls shared by many tests, and otherwise by evaluating the PMF only at the search probes. k, n and p0 may
+    be arrays; they are broadcast against each other.
+
+    :param k: (int or array_like) The number of successes
+    :param n: (int or array_like) The number of trials
+    :param p0: (float or array_like) The probability of success under the null hypothesis (default is 0.5)
+    :param alternative: (str) The alternative hypothesis, 'two-sided', 'greater', or 'less' (default is 'two-sided')
+
+    :return: (float or ndarray) The p-value(s) of the test
+    """
+    if alternative not in ['two-sided', 'greater', 'less']:
+        raise ValueError("Invalid alternative hypothesis. Choose from 'two-sided', 'greater', or 'less'.")
+    k, n = validate_count_arrays(k, n)
+    p0 = np.asarray(p0, dtype=np.float64)
+    if np.any(~((p0 >= 0) & (p0 <= 1))):
+        raise ValueError("p0 must be between 0 and 1 (inclusive).")
+    k, n, p0 = np.broadcast_arrays(k, n, p0)
+
+    if alternative == 'greater':
+        p_values = stats.binom.sf(k - 1, n, p0)
+    elif alternative == 'less':
+        p_values = stats.binom.cdf(k, n, p0)
+    elif k.ndim == 0 and n <= _BINOMIAL_TABLE_MAX_N:
+        p_values = _two_sided_binomial_table(int(k), int(n), float(p0))
+    else:
+        shape = k.shape
+        k, n, p0 = (np.ravel(x).astype(dtype) for x, dtype in ((k, np.int64), (n, np.int64), (p0, np.float64)))
+        p_values = np.empty(k.size)
+        searched = np.ones(k.size, dtype=bool)
+
+        # Group the small nulls through integer codes and one stable argsort, and use the table for those shared by
+        # enough tests.
+        small = np.flatnonzero(n <= _BINOMIAL_TABLE_MAX_N)
+        if small.size >= _BINOMIAL_TABLE_MIN_TESTS:
+            _, n_codes = np.unique(n[small], return_inverse=True)
+            p0_values, p0_codes = np.unique(p0[small], return_inverse=True)
+            codes = n_codes * p0_values.size + p0_codes
+            order = np.argsort(codes, kind='stable')
+            groups = np.split(small[order], np.flatnonzero(np.diff(codes[order])) + 1)
+            for members in groups:
+                if members.size >= _BINOMIAL_TABLE_MIN_TESTS:
+                    p_values[members] = _two_sided_binomial_table(k[members], int(n[members[0]]),
+                                                                  float(p0[members[0]]))
+                    searched[members] = False
+
+        rows = np.flatnonzero(searched)
+        p_values[rows] = _two_sided_binomial_search(k[rows], n[rows], p0[rows])
+        p_values = p_values.reshape(shape)
+
+    return float(p_values) if np.ndim(p_values) == 0 else p_values
 
 
 def proportion_confidence_interval(success, trials, alpha=0.05):
@@ -207,7 +929,7 @@ def proportion_confidence_interval(success, trials, alpha=0.05):
         raise ValueError("alpha must be between 0 and 1 (inclusive).")
 
     p = success / trials
-    z_alpha = stats.norm.ppf(1 - alpha / 2)
+    z_alpha = norm_ppf(1 - alpha / 2)
     standard_error = np.sqrt(p * (1 - p) / trials)
 
     lower_bound = p - z_alpha * standard_error
@@ -216,6 +938,30 @@ def proportion_confidence_interval(success, trials, alpha=0.05):
     return lower_bound, upper_bound
 
 
+def proportion_confidence_interval_batch(successes, trials, alpha=0.05):
+    """
+    Calculate the confidence intervals for many binomial proportions at once. This is the vectorized form of
+    proportion_confidence_interval: every group is handled by the same array expression and a single normal quantile.
+
+    :param successes: (array_like) The number of successes for each group
+    :param trials: (array_like) The total number of trials for each group
+    :param alpha: (float) The desired significance level (default is 0.05)
+
+    :return: (tuple) A tuple containing the arrays of lower and upper bounds of the confidence intervals
+    """
+    successes, trials = validate_count_arrays(successes, trials)
+    if np.any(trials <= 0):
+        raise ValueError("trials must be greater than 0.")
+    if not (0 <= alpha <= 1):
+        raise ValueError("alpha must be between 0 and 1 (inclusive).")
+
+    p = successes / trials
+    z_alpha = norm_ppf(1 - alpha / 2)
+    margin = z_alpha * np.sqrt(p * (1 - p) / trials)
+
+    return p - margin, p + margin
+
+
 def cohen_h_effect_size(p1, p2):
     """
     Calculate Cohen's h effect size for proportions.
@@ -260,13 +1006,196 @@ def continuity_corrected_proportion_z_test(successes1, trials1, successes2, tria
     z_stat = (p1 - p2 - np.sign(p1 - p2) * correction) / standard_error
 
     if alternative == 'two-sided':
-        p_value = (2 * (1 - stats.norm.cdf(abs(z_stat))))
+        p_value = 2 * norm_sf(abs(z_stat))
     elif alternative == 'greater':
-        p_value = 1 - stats.norm.cdf(z_stat)
+        p_value = norm_sf(z_stat)
     elif alternative == 'less':
-        p_value = stats.norm.cdf(z_stat)
+        p_value = norm_cdf(z_stat)
     else:
         raise ValueError("Invalid alternative hypothesis. Choose from 'two-sided', 'greater', or 'less'.")
 
     return p_value
 
+
+def continuity_corrected_proportion_z_test_batch(successes1, trials1, successes2, trials2, alternative='two-sided'):
+    """
+    Perform continuity-corrected proportion z-tests for many pairs of binomial proportions at once. This is the
+    vectorized form of continuity_corrected_proportion_z_test; degenerate rows are flagged in the returned mask and
+    get NaN statistics instead of raising.
+
+    :param successes1: (array_like) The number of successes in group 1 of each comparison
+    :param trials1: (array_like) The total number of trials in group 1 of each comparison
+    :param successes2: (array_like) The number of successes in group 2 of each comparison
+    :param trials2: (array_like) The total number of trials in group 2 of each comparison
+    :param alternative: (str) The alternative hypothesis, 'two-sided', 'greater', or 'less' (default is 'two-sided')
+
+    :return: (tuple) A tuple containing the z statistics (ndarray), the p-values (ndarray) and the mask of degenerate
+             rows (ndarray of bool)
+    """
+    if alternative not in ['two-sided', 'greater', 'less']:
+        raise ValueError("Invalid alternative hypothesis. Choose from 'two-sided', 'greater', or 'less'.")
+    successes1, trials1, successes2, trials2 = _two_sample_count_arrays(successes1, trials1, successes2, trials2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p1 = successes1 / trials1
+        p2 = successes2 / trials2
+        pooled_p = (successes1 + successes2) / (trials1 + trials2)
+        standard_error = np.sqrt(pooled_p * (1 - pooled_p) * (1 / trials1 + 1 / trials2))
+
+        # Apply continuity correction
+        correction = 1 / (2 * trials1) - 1 / (2 * trials2)
+        z_stat = (p1 - p2 - np.sign(p1 - p2) * correction) / standard_error
+
+    degenerate = (trials1 == 0) | (trials2 == 0) | ~(standard_error > 0)
+    z_stat = np.where(degenerate, np.nan, z_stat)
+
+    return z_stat, _z_test_p_values(z_stat, alternative), degenerate
+
+
+_CORRECTION_METHODS = ['bonferroni', 'holm', 'bh', 'by']
+_STREAM_BINS = 4096
+# Harmonic numbers up to this index are summed exactly, larger ones come from their asymptotic expansion.
+_HARMONIC_EXACT_LIMIT = 2 ** 16
+
+
+def _harmonic_number(m):
+    """
+    The harmonic number 1 + 1/2 + ... + 1/m of the Benjamini-Yekutieli correction, without an array of length m for
+    large m: the expansion log(m) + euler_gamma + 1/(2m) - 1/(12m^2) + 1/(120m^4) is exact to double precision there.
+    """
+    if m <= _HARMONIC_EXACT_LIMIT:
+        return float(np.sum(1 / np.arange(1, m + 1)))
+    return float(np.log(m) + np.euler_gamma + 1 / (2 * m) - 1 / (12 * m ** 2) + 1 / (120 * m ** 4))
+
+
+def adjust_p_values(p_values, method='bh'):
+    """
+    Adjust p-values for multiple testing with the Bonferroni, Holm, Benjamini-Hochberg ('bh') or Benjamini-Yekutieli
+    ('by') procedure. One sort of the p-values and a running maximum or minimum give all adjusted values in
+    O(m log m). NaN p-values (e.g. the degenerate rows of the batch tests) are not counted as tests and stay NaN.
+    float32 input gives float32 output.
+
+    :param p_values: (array_like) The p-values of the individual tests
+    :param method: (str, optional) The correction, 'bonferroni', 'holm', 'bh' or 'by' (default is 'bh')
+
+    :return: (ndarray) The adjusted p-values, with the shape of p_values
+    """
+    if method not in _CORRECTION_METHODS:
+        raise ValueError("Invalid method. Choose from 'bonferroni', 'holm', 'bh' or 'by'.")
+    p_values = np.asarray(p_values)
+    if p_values.dtype.kind not in 'iuf':
+        raise ValueError("p_values must be an array of numbers.")
+
+    flat = p_values.ravel()
+    tested = ~np.isnan(flat)
+    values = flat[tested]
+    if np.any((values < 0) | (values > 1)):
+        raise ValueError("p_values must be between 0 and 1 (inclusive).")
+
+    n_tests = values.size
+    if method == 'bonferroni':
+        adjusted_values = np.minimum(values * n_tests, 1)
+    else:
+        order = np.argsort(values, kind='stable')
+        sorted_values = values[order]
+        ranks = np.arange(1, n_tests + 1)
+        if method == 'holm':
+            sorted_adjusted = np.maximum.accumulate((n_tests - ranks + 1) * sorted_values)
+        else:
+            factor = n_tests / ranks
+            if method == 'by':
+                factor *= _harmonic_number(n_tests)
+            sorted_adjusted = np.minimum.accumulate((factor * sorted_values)[::-1])[::-1]
+        adjusted_values = np.empty(n_tests)
+        adjusted_values[order] = np.minimum(sorted_adjusted, 1)
+
+    adjusted = np.full(flat.shape, np.nan, dtype=np.result_type(p_values.dtype, np.float32))
+    adjusted[tested] = adjusted_values
+
+    return adjusted.reshape(p_values.shape)
+
+
+def top_k_discoveries(p_value_chunks, k=1000, alpha=0.05, method='bh', chunk_size=2 ** 20):
+    """
+    Find the rejected hypotheses of a multiple testing correction in one streaming pass, keeping only the k smallest
+    p-values (found with a partial sort per chunk) and a fixed-size histogram of the p-values below alpha. The chunks
+    keep their own dtype, so a float32 memmap of 10^8 p-values is never expanded to float64 as a whole.
+
+    Holm and Bonferroni reject a prefix of the sorted p-values, so their decisions on the k smallest are exact. The
+    step-up BH/BY decisions are exact when the histogram shows that no more than k hypotheses can be rejected. The
+    returned discoveries are always a subset of the true ones; complete is False when there may be more, in which
+    case a larger k gives the rest.
+
+    :param p_value_chunks: (iterable or ndarray) An iterable of p-value arrays, or one array that is read in chunks
+    :param k: (int, optional) The largest number of discoveries to keep (default is 1000)
+    :param alpha: (float, optional) The family-wise error rate or false discovery rate (default is 0.05)
+    :param method: (str, optional) The correction, 'bonferroni', 'holm', 'bh' or 'by' (default is 'bh')
+    :param chunk_size: (int, optional) The chunk length used when p_value_chunks is a single array (default is 2 ** 20)
+
+    :return: (tuple) The positions of the discoveries in the stream (ndarray), their p-values (ndarray, sorted in
+             increasing order) and whether the discoveries are complete (bool)
+    """
+    if method not in _CORRECTION_METHODS:
+        raise ValueError("Invalid method. Choose from 'bonferroni', 'holm', 'bh' or 'by'.")
+    if not isinstance(k, int) or k < 1:
+        raise ValueError("k must be a positive integer.")
+    if not 0 < alpha < 1:
+        raise ValueError("alpha must be between 0 and 1.")
+    if isinstance(p_value_chunks, np.ndarray):
+        flat = p_value_chunks.ravel()
+        p_value_chunks = (flat[start:start + chunk_size] for start in range(0, flat.size, chunk_size))
+
+    kept_p = None
+    kept_index = np.empty(0, dtype=np.int64)
+    histogram = np.zeros(_STREAM_BINS, dtype=np.int64)
+    n_tests = 0
+    offset = 0
+    for chunk in p_value_chunks:
+        chunk = np.asarray(chunk).ravel()
+        tested = ~np.isnan(chunk)
+        if np.any((chunk[tested] < 0) | (chunk[tested] > 1)):
+            raise ValueError("p_values must be between 0 and 1 (inclusive).")
+        n_tests += int(np.count_nonzero(tested))
+
+        # Only p-values up to alpha can be rejected by any of the corrections.
+        candidates = np.flatnonzero(chunk <= alpha)
+        histogram += np.bincount(np.minimum((chunk[candidates] * (_STREAM_BINS / alpha)).astype(np.int64),
+                                            _STREAM_BINS - 1), minlength=_STREAM_BINS)
+        kept_p = np.concatenate((chunk[:0] if kept_p is None else kept_p, chunk[candidates]))
+        kept_index = np.concatenate((kept_index, candidates + offset))
+        if kept_p.size > k:
+            smallest = np.argpartition(kept_p, k - 1)[:k]
+            kept_p, kept_index = kept_p[smallest], kept_index[smallest]
+        offset += chunk.size
+
+    if kept_p is None:
+        kept_p = np.empty(0)
+    order = np.argsort(kept_p, kind='stable')
+    kept_p, kept_index = kept_p[order], kept_index[order]
+    ranks = np.arange(1, kept_p.size + 1)
+    n_candidates = int(histogram.sum())
+
+    if method == 'bonferroni':
+        n_rejected = int(np.count_nonzero(kept_p <= alpha / max(n_tests, 1)))
+    elif method == 'holm':
+        n_rejected = int(np.argmin(np.append(kept_p <= alpha / (n_tests - ranks + 1), False)))
+    else:
+        level = alpha if method == 'bh' else alpha / _harmonic_number(n_tests)
+        below = np.flatnonzero(kept_p <= ranks * level / n_tests)
+        n_rejected = int(below[-1]) + 1 if below.size else 0
+
+    if method in ['bonferroni', 'holm']:
+        complete = n_rejected < kept_p.size or n_candidates == kept_p.size
+    elif n_candidates == kept_p.size:
+        complete = True
+    else:
+        # A rank r > k can only satisfy p_(r) <= r * level / n_tests if some histogram bin that holds the threshold
+        # r * level / n_tests already has at least r p-values at or below its upper edge.
+        width = alpha / _STREAM_BINS
+        edges = np.arange(_STREAM_BINS + 1) * width
+        first_rank = np.maximum(np.ceil(edges[:-1] * n_tests / level), k + 1)
+        last_rank = np.minimum(np.floor(edges[1:] * n_tests / level), n_tests)
+        possible = (first_rank <= last_rank) & (np.cumsum(histogram) >= first_rank)
+        complete = not np.any(possible)
+
+    return kept_index[:n_rejected], kept_p[:n_rejected], bool(complete)
@@ -0,0 +1,267 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from critical_values import beta_ppf, chi2_sf
+from hypothesis_testing import validate_count_arrays, _binomial_data_arrays, _expected_proportions_array, \
+    proportion_z_test_batch, fishers_exact_test_batch
+
+
+# Relative tolerance used when comparing simulated statistics with the observed one, so that tables with the same
+# statistic up to rounding count as at least as extreme.
+_TIE_TOLERANCE = 1e-9
+
+_POWER_TESTS = ['proportion_z_test', 'chi_square_test', 'fishers_exact_test']
+
+
+def _simulate_batch(task):
+    """
+    Simulate one batch of tables under the null hypothesis and count those at least as extreme as the observed one.
+    Module level so that it can be sent to worker processes.
+    """
+    kind, parameters, observed, size, seed_sequence = task
+    rng = np.random.default_rng(seed_sequence)
+
+    if kind == 'hypergeometric':
+        n_good, n_bad, n_sample, expected, alternative = parameters
+        simulated = rng.hypergeometric(n_good, n_bad, n_sample, size=size)
+        if alternative == 'greater':
+            return int(np.count_nonzero(simulated >= observed))
+        if alternative == 'less':
+            return int(np.count_nonzero(simulated <= observed))
+        deviation = np.abs(simulated - expected)
+        return int(np.count_nonzero(deviation >= abs(observed - expected) * (1 - _TIE_TOLERANCE)))
+
+    n_total, proportions, expected = parameters
+    simulated = rng.multinomial(n_total, proportions, size=size)
+    statistics = np.sum((simulated - expected) ** 2 / expected, axis=1)
+    return int(np.count_nonzero(statistics >= observed * (1 - _TIE_TOLERANCE)))
+
+
+def _run_simulation(kind, parameters, observed, alpha, confidence_level, max_simulations, batch_size, n_workers,
+                    seed):
+    """
+    Draw batches until the Clopper-Pearson interval of the p-value lies entirely above or below alpha, or the budget
+    is spent. Every batch has its own child of one SeedSequence and the stopping rule is checked batch by batch in the
+    same order, so the result depends only on the seed and the batch size, not on the number of workers.
+
+    :return: (tuple) The Monte Carlo p-value and the number of simulated tables
+    """
+    if not 0 < alpha < 1:
+        raise ValueError("alpha must be between 0 and 1.")
+    if not 0 < confidence_level < 1:
+        raise ValueError("Confidence level must be between 0 and 1.")
+    if not isinstance(max_simulations, int) or max_simulations < 1:
+        raise ValueError("max_simulations must be a positive integer.")
+    if not isinstance(batch_size, int) or batch_size < 1:
+        raise ValueError("batch_size must be a positive integer.")
+    if not isinstance(n_workers, int) or n_workers < 1:
+        raise ValueError("n_workers must be a positive integer.")
+
+    batch_sizes = [batch_size] * (max_simulations // batch_size)
+    if max_simulations % batch_size:
+        batch_sizes.append(max_simulations % batch_size)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+    tasks = [(kind, parameters, observed, size, seed_sequence)
+             for size, seed_sequence in zip(batch_sizes, seed_sequences)]
+    tail = (1 - confidence_level) / 2
+
+    executor = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+    try:
+        n_extreme = n_simulations = 0
+        for start in range(0, len(tasks), n_workers):
+            round_tasks = tasks[start:start + n_workers]
+            counts = executor.map(_simulate_batch, round_tasks) if executor else map(_simulate_batch, round_tasks)
+            for task, count in zip(round_tasks, counts):
+                n_extreme += count
+                n_simulations += task[3]
+                lower = beta_ppf(tail, n_extreme, n_simulations - n_extreme + 1) if n_extreme > 0 else 0.0
+                upper = beta_ppf(1 - tail, n_extreme + 1, n_simulations - n_extreme) \
+                    if n_extreme < n_simulations else 1.0
+                if upper < alpha or lower > alpha:
+                    return (n_extreme + 1) / (n_simulations + 1), n_simulations
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return (n_extreme + 1) / (n_simulations + 1), n_simulations
+
+
+def monte_carlo_proportion_test(successes1, trials1, successes2, trials2, alternative='two-sided', alpha=0.05,
+                                confidence_level=0.99, max_simulations=1000000, batch_size=10000, n_workers=1,
+                                seed=None):
+    """
+    Perform a permutation test for the equality of two binomial proportions, as an alternative to proportion_z_test
+    when the counts are small. Permuting the group labels with the margins fixed makes the successes of group 1
+    hypergeometric, so a batch of permuted tables is one vectorized hypergeometric draw. The two-sided test counts
+    the tables whose group 1 successes are at least as far from their expected value as the observed ones. Sampling
+    stops as soon as the confidence interval of the p-value clears alpha, so the budget is only spent where it
+    changes the decision.
+
+    :param successes1: (int) The number of successes in group 1
+    :param trials1: (int) The total number of trials in group 1
+    :param successes2: (int) The number of successes in group 2
+    :param trials2: (int) The total number of trials in group 2
+    :param alternative: (str) The alternative hypothesis, 'two-sided', 'greater', or 'less' (default is 'two-sided')
+    :param alpha: (float, optional) The significance level the decision is made at (default is 0.05)
+    :param confidence_level: (float, optional) The confidence level of the interval used to stop (default is 0.99)
+    :param max_simulations: (int, optional) The largest number of permuted tables (default is 1000000)
+    :param batch_size: (int, optional) The number of permuted tables drawn per batch (default is 10000)
+    :param n_workers: (int, optional) The number of worker processes to spread the batches over (default is 1)
+    :param seed: (int, optional) A seed value for the random number generator, if reproducibility is desired
+
+    :return: (tuple) The Monte Carlo p-value and the number of permuted tables it is based on
+    """
+    if alternative not in ['two-sided', 'greater', 'less']:
+        raise ValueError("Invalid alternative hypothesis. Choose from 'two-sided', 'greater', or 'less'.")
+    validate_count_arrays([successes1, successes2], [trials1, trials2])
+    if trials1 == 0 or trials2 == 0:
+        raise ValueError("trials1 and trials2 must be positive.")
+
+    n_good = successes1 + successes2
+    n_bad = trials1 + trials2 - n_good
+    expected = trials1 * n_good / (trials1 + trials2)
+    parameters = (n_good, n_bad, trials1, expected, alternative)
+
+    return _run_simulation('hypergeometric', parameters, successes1, alpha, confidence_level, max_simulations,
+                           batch_size, n_workers, seed)
+
+
+def monte_carlo_chi_square_test(binomial_data=None, expected_proportions=None, successes=None, trials=None,
+                                alpha=0.05, confidence_level=0.99, max_simulations=1000000, batch_size=10000,
+                                n_workers=1, seed=None):
+    """
+    Perform the chi-square test of chi_square_test with a Monte Carlo p-value instead of the chi-square
+    approximation, which is unreliable when the expected counts are small. Under the null hypothesis the successes
+    are multinomial over the groups with the expected proportions, so a batch of simulated tables is one vectorized
+    multinomial draw. Sampling stops as soon as the confidence interval of the p-value clears alpha.
+
+    :param binomial_data: (list or ndarray) A list of tuples containing the number of successes and total trials for
+                          each group, or a (k, 2) integer array with the same columns
+    :param expected_proportions: (list or ndarray, optional) A list of expected proportions for each group. If not
+                                  provided, the test will assume equal proportions.
+    :param successes: (array_like, optional) The number of successes for each group, used instead of binomial_data
+    :param trials: (array_like, optional) The number of trials for each group, used instead of binomial_data
+    :param alpha: (float, optional) The significance level the decision is made at (default is 0.05)
+    :param confidence_level: (float, optional) The confidence level of the interval used to stop (default is 0.99)
+    :param max_simulations: (int, optional) The largest number of simulated tables (default is 1000000)
+    :param batch_size: (int, optional) The number of simulated tables drawn per batch (default is 10000)
+    :param n_workers: (int, optional) The number of worker processes to spread the batches over (default is 1)
+    :param seed: (int, optional) A seed value for the random number generator, if reproducibility is desired
+
+    :return: (tuple) The Monte Carlo p-value and the number of simulated tables it is based on
+    """
+    observed_successes, _ = _binomial_data_arrays(binomial_data, successes, trials)
+    n_groups = observed_successes.size
+    proportions = _expected_proportions_array(expected_proportions, n_groups, check_sum=True)
+    proportions = np.broadcast_to(np.asarray(proportions, dtype=np.float64), (n_groups,))
+    n_total = int(np.sum(observed_successes))
+    if n_total == 0 or np.any(proportions == 0):
+        raise ValueError("The test needs at least one success and positive expected proportions.")
+
+    expected = n_total * proportions
+    observed = float(np.sum((observed_successes - expected) ** 2 / expected))
+    parameters = (n_total, proportions, expected)
+
+    return _run_simulation('multinomial', parameters, observed, alpha, confidence_level, max_simulations, batch_size,
+                           n_workers, seed)
+
+
+def _rejections(test, successes1, trials1, successes2, trials2, alpha, alternative):
+    """
+    Count the simulated experiments in which the test rejects the null hypothesis at alpha. Degenerate experiments,
+    whose p-value is NaN, count as not rejected.
+    """
+    if test == 'fishers_exact_test':
+        p_value = fishers_exact_test_batch(successes1, trials1, successes2, trials2, alternative=alternative)
+    else:
+        z_stat, p_value, _ = proportion_z_test_batch(successes1, trials1, successes2, trials2, alternative=alternative)
+        if test == 'chi_square_test':
+            # The Pearson chi-square statistic of a 2x2 table is the square of the pooled z statistic.
+            p_value = chi2_sf(z_stat ** 2, 1)
+    return int(np.count_nonzero(p_value <= alpha))
+
+
+def _simulate_power_batch(task):
+    """
+    Simulate one batch of A/B experiments under the alternative and under the null hypothesis and count the
+    rejections of each. Module level so that it can be sent to worker processes.
+    """
+    test, p1, p2, p_null, trials1, trials2, alpha, alternative, size, seed_sequence = task
+    rng = np.random.default_rng(seed_sequence)
+
+    rejections = []
+    for q1, q2 in [(p1, p2), (p_null, p_null)]:
+        successes1 = rng.binomial(trials1, q1, size=size)
+        successes2 = rng.binomial(trials2, q2, size=size)
+        rejections.append(_rejections(test, successes1, trials1, successes2, trials2, alpha, alternative))
+    return tuple(rejections)
+
+
+def monte_carlo_power(p1, p2, sample_size1, test='proportion_z_test', alpha=0.05, alternative='two-sided', ratio=1,
+                      n_simulations=100000, batch_size=100000, n_workers=1, seed=None):
+    """
+    Estimate the power and the size (type I error rate) of a two-sample test of binomial proportions by simulation,
+    to check power_analysis_binomial_proportions or to study tests it does not cover. Each batch simulates
+    batch_size A/B experiments with the true proportions p1 and p2, and as many under the null hypothesis with both
+    groups at the pooled proportion (p1 + ratio * p2) / (1 + ratio) that the power analysis assumes. The vectorized
+    test runs over the whole batch at once. Every batch has its own child of one SeedSequence, so the result depends
+    only on the seed and the batch size, not on the number of workers.
+
+    :param p1: (float) The true proportion in group 1
+    :param p2: (float) The true proportion in group 2
+    :param sample_size1: (int) The number of trials in group 1
+    :param test: (str) The test to evaluate, 'proportion_z_test', 'chi_square_test', or 'fishers_exact_test'
+                 (default is 'proportion_z_test')
+    :param alpha: (float, optional) The significance level of the test (default is 0.05)
+    :param alternative: (str) The alternative hypothesis, 'two-sided', 'greater', or 'less' (default is 'two-sided').
+                        The chi-square test is two-sided only.
+    :param ratio: (float) The ratio of sample sizes between group 2 and group 1 (default is 1)
+    :param n_simulations: (int, optional) The number of simulated experiments under each hypothesis (default is
+                          100000)
+    :param batch_size: (int, optional) The number of experiments simulated per batch (default is 100000)
+    :param n_workers: (int, optional) The number of worker processes to spread the batches over (default is 1)
+    :param seed: (int, optional) A seed value for the random number generator, if reproducibility is desired
+
+    :return: (dict) The empirical power and size, their Monte Carlo standard errors ('power_standard_error' and
+             'size_standard_error') and the number of simulated experiments per hypothesis ('n_simulations')
+    """
+    if test not in _POWER_TESTS:
+        raise ValueError("Invalid test. Choose from 'proportion_z_test', 'chi_square_test', or 'fishers_exact_test'.")
+    if alternative not in ['two-sided', 'greater', 'less']:
+        raise ValueError("Invalid alternative hypothesis. Choose from 'two-sided', 'greater', or 'less'.")
+    if test == 'chi_square_test' and alternative != 'two-sided':
+        raise ValueError("The chi-square test is two-sided only.")
+    if not (0 <= p1 <= 1) or not (0 <= p2 <= 1) or not 0 < alpha < 1:
+        raise ValueError("p1 and p2 must be between 0 and 1 (inclusive), and alpha between 0 and 1.")
+    if not isinstance(sample_size1, int) or sample_size1 < 1 or ratio <= 0:
+        raise ValueError("sample_size1 must be a positive integer and ratio must be positive.")
+    if not isinstance(n_simulations, int) or n_simulations < 1:
+        raise ValueError("n_simulations must be a positive integer.")
+    if not isinstance(batch_size, int) or batch_size < 1:
+        raise ValueError("batch_size must be a positive integer.")
+    if not isinstance(n_workers, int) or n_workers < 1:
+        raise ValueError("n_workers must be a positive integer.")
+
+    sample_size2 = max(1, int(round(ratio * sample_size1)))
+    p_null = (p1 + ratio * p2) / (1 + ratio)
+
+    batch_sizes = [batch_size] * (n_simulations // batch_size)
+    if n_simulations % batch_size:
+        batch_sizes.append(n_simulations % batch_size)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+    tasks = [(test, p1, p2, p_null, sample_size1, sample_size2, alpha, alternative, size, seed_sequence)
+             for size, seed_sequence in zip(batch_sizes, seed_sequences)]
+
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            counts = list(executor.map(_simulate_power_batch, tasks))
+    else:
+        counts = [_simulate_power_batch(task) for task in tasks]
+
+    power, size = np.sum(counts, axis=0) / n_simulations
+    return {
+        'power': power,
+        'power_standard_error': np.sqrt(power * (1 - power) / n_simulations),
+        'size': size,
+        'size_standard_error': np.sqrt(size * (1 - size) / n_simulations),
+        'n_simulations': n_simulations
+    }
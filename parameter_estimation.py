@@ -1,28 +1,259 @@
 import numpy as np
 import math
-from scipy.optimize import minimize_scalar
-from scipy.stats import beta
-from Probability import pmf
-from scipy.stats import norm
+from scipy.special import gammaln, xlogy, xlog1py
 from scipy.stats import binom
+from hypothesis_testing import validate_count_arrays
+from critical_values import norm_ppf, beta_ppf
+
+
+_CHUNK_SIZE = 65536
+
+
+class MomentAccumulator:
+    """
+    Running sample count, mean and sum of squared deviations (M2) of a stream of binomial samples. Chunks are folded
+    in with the Welford / Chan update, so the samples never have to be held in memory at the same time and the state
+    can be updated incrementally as new data arrives.
+
+    Attributes:
+        count (int): The number of samples seen so far.
+        mean (float): The running sample mean.
+        m2 (float): The running sum of squared deviations from the mean.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, chunk):
+        """
+        Fold a chunk of samples into the accumulator.
+
+        :param chunk: (int, list or ndarray) A single sample or an array-like chunk of samples
+
+        :return: (MomentAccumulator) The updated accumulator
+        """
+        values = np.asarray(chunk, dtype=np.float64).ravel()
+        chunk_count = values.size
+        if chunk_count == 0:
+            return self
+
+        chunk_mean = float(values.mean())
+        chunk_m2 = float(np.dot(values - chunk_mean, values - chunk_mean))
+
+        total = self.count + chunk_count
+        delta = chunk_mean - self.mean
+        self.mean += delta * chunk_count / total
+        self.m2 += chunk_m2 + delta ** 2 * self.count * chunk_count / total
+        self.count = total
+        return self
+
+    def update_from(self, sample_data):
+        """
+        Fold every sample of an iterable (a list, an ndarray, a generator of samples or a stream of ndarray chunks)
+        into the accumulator in a single pass.
+
+        :param sample_data: (iterable) The samples to add
+
+        :return: (MomentAccumulator) The updated accumulator
+        """
+        for chunk in _iter_chunks(sample_data):
+            self.update(chunk)
+        return self
+
+    @property
+    def variance(self):
+        """
+        The (population) variance of the samples seen so far.
+
+        :return: (float) The variance, or 0.0 if no samples have been seen
+        """
+        if self.count == 0:
+            return 0.0
+        return self.m2 / self.count
+
+    def merge(self, other):
+        """
+        Combine the state of another accumulator (for example one built on a different partition of the data) into
+        this one in O(1), using the Chan et al. pairwise update.
+
+        :param other: (MomentAccumulator) The accumulator to merge in
+
+        :return: (MomentAccumulator) The updated accumulator
+        """
+        if other.count == 0:
+            return self
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        return self
+
+
+class SufficientStatistics(MomentAccumulator):
+    """
+    Mergeable sufficient statistics of a sample of binomial observations: the count, the sum, the running mean and
+    M2, and the histogram of values. Each partition of a sharded sample can be summarised on its own worker, the
+    summaries combined with merge(), and every estimator and interval function in this module can finish from the
+    merged object instead of the raw data. The state is plain numbers and one integer array, so it pickles and
+    round-trips through to_dict() / from_dict().
+
+    Attributes:
+        count (int): The number of samples seen so far.
+        total (int): The sum of the samples seen so far.
+        mean (float): The running sample mean.
+        m2 (float): The running sum of squared deviations from the mean.
+        histogram (ndarray): The number of samples equal to each value 0, 1, ..., max(samples).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.total = 0
+        self.histogram = np.zeros(0, dtype=np.int64)
+
+    def update(self, chunk):
+        """
+        Fold a chunk of samples into the statistics.
+
+        :param chunk: (int, list or ndarray) A single sample or an array-like chunk of non-negative integer samples
+
+        :return: (SufficientStatistics) The updated statistics
+        """
+        chunk = np.asarray(chunk).ravel()
+        if chunk.dtype.kind not in 'iu':
+            if chunk.dtype.kind != 'f' or not np.all(chunk == np.floor(chunk)):
+                raise ValueError("Sample data must contain non-negative integers.")
+            chunk = chunk.astype(np.int64)
+        if chunk.size == 0:
+            return self
+        if chunk.min() < 0:
+            raise ValueError("Sample data must contain non-negative integers.")
+
+        super().update(chunk)
+        chunk_histogram = np.bincount(chunk)
+        self.total += int(np.dot(np.arange(chunk_histogram.size), chunk_histogram))
+        self._add_histogram(chunk_histogram)
+        return self
+
+    def merge(self, other):
+        """
+        Combine the statistics of another partition into this one. The moments merge in O(1) and the histograms in
+        O(max value), independent of the number of samples in either partition.
+
+        :param other: (SufficientStatistics) The statistics to merge in
+
+        :return: (SufficientStatistics) The updated statistics
+        """
+        super().merge(other)
+        self.total += other.total
+        self._add_histogram(other.histogram)
+        return self
+
+    def _add_histogram(self, histogram):
+        if histogram.size > self.histogram.size:
+            histogram = histogram.astype(np.int64)
+            histogram[:self.histogram.size] += self.histogram
+            self.histogram = histogram
+        else:
+            self.histogram[:histogram.size] += histogram
+
+    def value_counts(self):
+        """
+        The distinct values seen so far and the number of times each occurs.
+
+        :return: (tuple) A tuple containing the distinct values (ndarray) and their counts (ndarray)
+        """
+        values = np.flatnonzero(self.histogram)
+        return values, self.histogram[values]
+
+    def to_dict(self):
+        """
+        Serialize the statistics to a dictionary of plain Python numbers and lists (JSON compatible).
+
+        :return: (dict) The serialized statistics
+        """
+        return {'count': self.count, 'total': self.total, 'mean': self.mean, 'm2': self.m2,
+                'histogram': self.histogram.tolist()}
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Rebuild statistics serialized with to_dict().
+
+        :param state: (dict) The serialized statistics
+
+        :return: (SufficientStatistics) The rebuilt statistics
+        """
+        statistics = cls()
+        statistics.count = int(state['count'])
+        statistics.total = int(state['total'])
+        statistics.mean = float(state['mean'])
+        statistics.m2 = float(state['m2'])
+        statistics.histogram = np.asarray(state['histogram'], dtype=np.int64)
+        return statistics
+
+
+def _as_sufficient_statistics(sample_data):
+    """
+    Return sample_data itself if it is already a SufficientStatistics object, otherwise summarise it in one pass.
+    """
+    if isinstance(sample_data, SufficientStatistics):
+        return sample_data
+    return SufficientStatistics().update_from(sample_data)
+
+
+def _iter_chunks(sample_data, chunk_size=_CHUNK_SIZE):
+    """
+    Yield the samples of an iterable as array-like chunks of at most chunk_size values. Scalars are buffered into
+    chunks and large arrays are sliced, so the accumulators only ever see bounded temporaries.
+    """
+    if isinstance(sample_data, np.ndarray):
+        sample_data = [sample_data]
+
+    buffer = []
+    for item in sample_data:
+        if np.ndim(item) == 0:
+            buffer.append(item)
+            if len(buffer) == chunk_size:
+                yield buffer
+                buffer = []
+            continue
+
+        if buffer:
+            yield buffer
+            buffer = []
+        item = np.asarray(item).ravel()
+        for start in range(0, item.size, chunk_size):
+            yield item[start:start + chunk_size]
+    if buffer:
+        yield buffer
 
 
 def estimate_parameters(sample_data):
     """
     Estimate the parameters of a binomial distribution (number of trials and probability of success)
-    using the method of moments based on sample data.
+    using the method of moments based on sample data. The moments are computed in a single streaming pass, so the
+    sample data can be any iterable, a stream of ndarray chunks, or an already populated MomentAccumulator.
 
-    :param sample_data: (list) A list of binomial samples with the same number of trials and success probability.
+    :param sample_data: (iterable or MomentAccumulator) Binomial samples with the same number of trials and success
+                        probability.
 
     :return: (tuple) A tuple containing the estimated number of trials (int) and the estimated probability of success
     (float).
     """
-    if not sample_data:
+    if isinstance(sample_data, MomentAccumulator):
+        accumulator = sample_data
+    else:
+        accumulator = MomentAccumulator().update_from(sample_data)
+
+    if accumulator.count == 0:
         raise ValueError("Sample data cannot be empty.")
 
-    sample_size = len(sample_data)
-    sample_mean = sum(sample_data) / sample_size
-    sample_variance = sum((x - sample_mean) ** 2 for x in sample_data) / sample_size
+    sample_mean = accumulator.mean
+    sample_variance = accumulator.variance
 
     if sample_variance == 0:
         raise ValueError("Sample variance cannot be zero. Provide a more varied sample data.")
@@ -38,38 +269,151 @@ def estimate_parameters(sample_data):
     return n_estimate, p_estimate
 
 
-def log_likelihood(p, sample_data):
+def value_counts(sample_data):
     """
-    Calculate the log-likelihood of the sample data given the probability of success (p).
+    Compress binomial samples into their distinct values and the number of times each value occurs, streaming over
+    the data in chunks.
+
+    :param sample_data: (iterable or SufficientStatistics) Non-negative integer binomial samples
+
+    :return: (tuple) A tuple containing the distinct values (ndarray) and their counts (ndarray)
+    """
+    return _as_sufficient_statistics(sample_data).value_counts()
+
+
+def _binomial_log_pmf(k, n, p):
+    """
+    Vectorized binomial log-PMF, log(C(n, k) p^k (1 - p)^(n - k)), evaluated with gammaln so it stays finite for
+    large n. Broadcasts over k, n and p.
+    """
+    k = np.asarray(k, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    return gammaln(n + 1) - gammaln(k + 1) - gammaln(n - k + 1) + xlogy(k, p) + xlog1py(n - k, -p)
+
+
+def log_likelihood(p, sample_data, n_trials=None):
+    """
+    Calculate the log-likelihood of the sample data given the probability of success (p). The data is compressed to
+    its value counts once and the log-PMF is evaluated only on the distinct values.
 
     :param p: (float) The probability of success
-    :param sample_data: (list) A list of binomial samples with the same number of trials and success probability.
+    :param sample_data: (iterable or SufficientStatistics) Binomial samples with the same number of trials and
+                        success probability.
+    :param n_trials: (int, optional) The number of trials. If not provided, the largest sample value is used.
 
     :return: (float) The log-likelihood of the sample data given p
     """
+    if not 0 <= p <= 1:
+        raise ValueError("p must be a probability value between 0 and 1 (inclusive).")
+
+    values, counts = value_counts(sample_data)
+    if n_trials is None:
+        n_trials = int(values[-1]) if values.size else 0
+    if values.size and values[-1] > n_trials:
+        raise ValueError("Sample values cannot exceed the number of trials.")
 
-    n = len(sample_data)
-    log_likelihood_value = sum(np.log(pmf(x, max(sample_data), p)) for x in sample_data)
-    # log_likelihood_value = sum(np.log(binom.pmf(sample_data, n, p)))
-    return log_likelihood_value
+    return float(np.dot(counts, _binomial_log_pmf(values, n_trials, p)))
 
 
-def mle_estimate_parameters(sample_data):
+def mle_estimate_parameters(sample_data, n_trials=None):
     """
     Estimate the parameters of a binomial distribution (number of trials and probability of success)
-    using Maximum Likelihood Estimation (MLE) based on sample data.
+    using Maximum Likelihood Estimation (MLE) based on sample data. For a known number of trials the MLE of p is the
+    closed form sum(x) / (N * n), so only the sample sum and count are needed.
+
+    :param sample_data: (iterable or SufficientStatistics) Binomial samples with the same number of trials and
+                        success probability
+    :param n_trials: (int, optional) The known number of trials. If not provided, the largest sample value is used.
+
+    :return: (tuple) A tuple containing the estimated number of trials (int) and the estimated probability of success
+    (float)
+    """
+    values, counts = value_counts(sample_data)
+    if values.size == 0:
+        raise ValueError("Sample data cannot be empty.")
 
-    :param sample_data: (list) A list of binomial samples with the same number of trials and success probability
+    n_estimate = int(values[-1]) if n_trials is None else n_trials
+    if values[-1] > n_estimate:
+        raise ValueError("Sample values cannot exceed the number of trials.")
+    if n_estimate == 0:
+        return n_estimate, 0.0
+
+    p_estimate = float(np.dot(values, counts)) / (float(counts.sum()) * n_estimate)
+
+    return n_estimate, p_estimate
+
+
+def _profile_log_likelihood(values, counts, sample_mean, n_candidates):
+    """
+    Profile log-likelihood of integer n (with p profiled out as sample_mean / n), evaluated for every candidate n in
+    one vectorized call over the (distinct values x candidate n) grid.
+    """
+    n_candidates = np.asarray(n_candidates, dtype=np.float64)
+    log_pmf = _binomial_log_pmf(values[:, None], n_candidates[None, :], sample_mean / n_candidates[None, :])
+    return counts @ log_pmf
+
+
+def profile_mle_estimate_parameters(sample_data, n_max=None, grid_size=256):
+    """
+    Jointly estimate the parameters of a binomial distribution (number of trials and probability of success) by
+    Maximum Likelihood. The data is compressed into a value-count histogram once, p is profiled out as mean / n and
+    the profile likelihood is maximised over integer n: the optimum is bracketed by doubling the step away from
+    max(sample_data), then narrowed by ternary search until the bracket can be scanned in one vectorized evaluation.
+    The cost is O(distinct values x candidate n) and does not depend on the sample size.
+
+    :param sample_data: (iterable or SufficientStatistics) Binomial samples with the same number of trials and
+                        success probability
+    :param n_max: (int, optional) The largest number of trials to consider (default is max(10**6, 1000 * max(x)))
+    :param grid_size: (int, optional) Bracket width at which the remaining candidates are scanned at once (default
+                      is 256)
 
     :return: (tuple) A tuple containing the estimated number of trials (int) and the estimated probability of success
     (float)
     """
-    if not sample_data:
+    values, counts = value_counts(sample_data)
+    if values.size == 0:
         raise ValueError("Sample data cannot be empty.")
 
-    n_estimate = max(sample_data)
-    result = minimize_scalar(lambda p: -log_likelihood(p, sample_data), bounds=(0, 1), method='bounded')
-    p_estimate = result.x
+    n_low = int(values[-1])
+    if n_low == 0:
+        raise ValueError("Sample data must contain at least one success to estimate the number of trials.")
+    if n_max is None:
+        n_max = max(10 ** 6, 1000 * n_low)
+    if n_max < n_low:
+        raise ValueError("n_max cannot be smaller than the largest sample value.")
+
+    sample_mean = float(np.dot(values, counts)) / float(counts.sum())
+
+    def profile(n):
+        return _profile_log_likelihood(values, counts, sample_mean, [n])[0]
+
+    # Bracket the optimum: double the distance from n_low until the profile likelihood stops increasing.
+    lower, middle, step = n_low, n_low, 1
+    middle_value = profile(middle)
+    while True:
+        upper = min(n_low + step, n_max)
+        upper_value = profile(upper)
+        if upper_value <= middle_value:
+            break
+        if upper == n_max:
+            raise ValueError("The profile likelihood is still increasing at n_max; the sample variance is too large "
+                             "relative to the mean for a finite estimate of n.")
+        lower, middle, middle_value = middle, upper, upper_value
+        step *= 2
+
+    # Narrow the bracket with ternary search, then scan what is left in one vectorized call.
+    while upper - lower > grid_size:
+        third = (upper - lower) // 3
+        left, right = lower + third, upper - third
+        left_value, right_value = _profile_log_likelihood(values, counts, sample_mean, [left, right])
+        if left_value < right_value:
+            lower = left
+        else:
+            upper = right
+
+    candidates = np.arange(lower, upper + 1)
+    n_estimate = int(candidates[np.argmax(_profile_log_likelihood(values, counts, sample_mean, candidates))])
+    p_estimate = sample_mean / n_estimate
 
     return n_estimate, p_estimate
 
@@ -80,16 +424,18 @@ def confidence_interval_normal_approximation(sample_data, confidence_level=0.95)
     using the normal approximation method. The function uses the normal approximation method. Please note that the
     normal approximation method might not be accurate for small sample sizes or extreme probabilities (close to 0 or 1).
 
-    :param sample_data: (list) A list of binomial samples with the same number of trials and success probability
+    :param sample_data: (list or SufficientStatistics) A list of binomial samples with the same number of trials and
+                        success probability
     :param confidence_level: (float, optional) The desired confidence level (default is 0.95)
 
     :return: (tuple)  A tuple containing the lower and upper bounds of the confidence interval for p
     """
-    if not sample_data:
+    statistics = _as_sufficient_statistics(sample_data)
+    if statistics.count == 0:
         raise ValueError("Sample data cannot be empty.")
 
-    n = len(sample_data)
-    _, p_estimate = estimate_parameters(sample_data)
+    n = statistics.count
+    _, p_estimate = estimate_parameters(statistics)
     standard_error = math.sqrt(p_estimate * (1 - p_estimate) / n)
 
     if p_estimate < 0 or p_estimate > 1:
@@ -99,7 +445,7 @@ def confidence_interval_normal_approximation(sample_data, confidence_level=0.95)
 
     # z_score = abs(np.percentile(np.random.standard_normal(100000), (1 - confidence_level) / 2 + confidence_level *
     # 100))
-    z_score = norm.ppf(1 - (1 - confidence_level) / 2)
+    z_score = norm_ppf(1 - (1 - confidence_level) / 2)
     margin_of_error = z_score * standard_error
 
     lower_bound = max(0, p_estimate - margin_of_error)
@@ -113,21 +459,23 @@ def confidence_interval_clopper_pearson(sample_data, confidence_level=0.95):
     Calculate the confidence interval for the probability of success (p) in a binomial distribution
     using the Clopper-Pearson (exact) method.
 
-    :param sample_data: (list) A list of binomial samples with the same number of trials and success probability
+    :param sample_data: (list or SufficientStatistics) A list of binomial samples with the same number of trials and
+                        success probability
     :param confidence_level: (float, optional) The desired confidence level (default is 0.95)
 
     :return: (tuple) A tuple containing the lower and upper bounds of the confidence interval for p
     """
-    if not sample_data:
+    statistics = _as_sufficient_statistics(sample_data)
+    if statistics.count == 0:
         raise ValueError("Sample data cannot be empty.")
 
-    n = len(sample_data)
-    n_trials, _ = estimate_parameters(sample_data)
-    total_successes = sum(sample_data)
+    n = statistics.count
+    n_trials, _ = estimate_parameters(statistics)
+    total_successes = statistics.total
 
     alpha = 1 - confidence_level
-    lower_bound = beta.ppf(alpha / 2, total_successes, n * n_trials - total_successes + 1)
-    upper_bound = beta.ppf(1 - alpha / 2, total_successes + 1, n * n_trials - total_successes)
+    lower_bound = beta_ppf(alpha / 2, total_successes, n * n_trials - total_successes + 1)
+    upper_bound = beta_ppf(1 - alpha / 2, total_successes + 1, n * n_trials - total_successes)
 
     return lower_bound, upper_bound
 
@@ -138,24 +486,30 @@ def confidence_interval_agresti_coull(sample_data, confidence_level=0.95):
     using the Agresti-Coull method. This approach assumes that the sample data represents the number of successes in
     each trial, not the actual outcomes of each trial.
 
-    :param sample_data: (list)  A list of binomial samples with the same number of trials and success probability
+    :param sample_data: (list or SufficientStatistics)  A list of binomial samples with the same number of trials and
+                        success probability
     :param confidence_level: (float, optional) The desired confidence level (default is 0.95)
 
     :return: (tuple) A tuple containing the lower and upper bounds of the confidence interval for p
     """
-    if not isinstance(sample_data, list) or len(sample_data) == 0:
-        raise ValueError("Sample data must be a non-empty list.")
-    if not all(isinstance(d, int) for d in sample_data):
-        raise ValueError("All sample data must be integers.")
+    if isinstance(sample_data, SufficientStatistics):
+        if sample_data.count == 0:
+            raise ValueError("Sample data must be non-empty.")
+    else:
+        if not isinstance(sample_data, list) or len(sample_data) == 0:
+            raise ValueError("Sample data must be a non-empty list.")
+        if not all(isinstance(d, int) for d in sample_data):
+            raise ValueError("All sample data must be integers.")
     if not 0 <= confidence_level <= 1:
         raise ValueError("Confidence level must be between 0 and 1.")
 
-    trials = len(sample_data)
-    successes = sum(sample_data)
+    statistics = _as_sufficient_statistics(sample_data)
+    trials = statistics.count
+    successes = statistics.total
 
     # n = len(sample_data)
     p_estimate = successes / trials
-    z_score = norm.ppf(1 - (1 - confidence_level) / 2)
+    z_score = norm_ppf(1 - (1 - confidence_level) / 2)
 
     adjusted_n = trials + z_score ** 2
     adjusted_p = (successes + (z_score ** 2) / 2) / adjusted_n
@@ -178,3 +532,165 @@ def confidence_interval_agresti_coull(sample_data, confidence_level=0.95):
     upper_bound = min(1, adjusted_p + margin_of_error)
 
     return lower_bound, upper_bound
+
+
+def _validate_batch_input(successes, trials, confidence_level):
+    """
+    Shared validation of the batch confidence interval functions.
+    """
+    successes, trials = validate_count_arrays(successes, trials)
+    if np.any(trials <= 0):
+        raise ValueError("trials must be greater than 0.")
+    if not 0 <= confidence_level <= 1:
+        raise ValueError("Confidence level must be between 0 and 1.")
+    return successes, trials
+
+
+def confidence_interval_normal_approximation_batch(successes, trials, confidence_level=0.95):
+    """
+    Calculate normal approximation confidence intervals for the probability of success (p) of many groups at once.
+
+    :param successes: (array_like) The number of successes for each group
+    :param trials: (array_like) The number of trials for each group
+    :param confidence_level: (float, optional) The desired confidence level (default is 0.95)
+
+    :return: (tuple) A tuple containing the arrays of lower and upper bounds of the confidence intervals for p
+    """
+    successes, trials = _validate_batch_input(successes, trials, confidence_level)
+
+    p_estimate = successes / trials
+    z_score = norm_ppf(1 - (1 - confidence_level) / 2)
+    margin_of_error = z_score * np.sqrt(p_estimate * (1 - p_estimate) / trials)
+
+    lower_bound = np.maximum(0, p_estimate - margin_of_error)
+    upper_bound = np.minimum(1, p_estimate + margin_of_error)
+
+    return lower_bound, upper_bound
+
+
+def confidence_interval_clopper_pearson_batch(successes, trials, confidence_level=0.95):
+    """
+    Calculate Clopper-Pearson (exact) confidence intervals for the probability of success (p) of many groups at once.
+    Groups with no successes get a lower bound of 0 and groups with only successes an upper bound of 1.
+
+    :param successes: (array_like) The number of successes for each group
+    :param trials: (array_like) The number of trials for each group
+    :param confidence_level: (float, optional) The desired confidence level (default is 0.95)
+
+    :return: (tuple) A tuple containing the arrays of lower and upper bounds of the confidence intervals for p
+    """
+    successes, trials = _validate_batch_input(successes, trials, confidence_level)
+
+    alpha = 1 - confidence_level
+    lower_bound = np.where(successes == 0, 0.0, beta_ppf(alpha / 2, successes, trials - successes + 1))
+    upper_bound = np.where(successes == trials, 1.0, beta_ppf(1 - alpha / 2, successes + 1, trials - successes))
+
+    return lower_bound, upper_bound
+
+
+def confidence_interval_agresti_coull_batch(successes, trials, confidence_level=0.95):
+    """
+    Calculate Agresti-Coull confidence intervals for the probability of success (p) of many groups at once.
+
+    :param successes: (array_like) The number of successes for each group
+    :param trials: (array_like) The number of trials for each group
+    :param confidence_level: (float, optional) The desired confidence level (default is 0.95)
+
+    :return: (tuple) A tuple containing the arrays of lower and upper bounds of the confidence intervals for p
+    """
+    successes, trials = _validate_batch_input(successes, trials, confidence_level)
+
+    z_score = norm_ppf(1 - (1 - confidence_level) / 2)
+    adjusted_n = trials + z_score ** 2
+    adjusted_p = np.clip((successes + (z_score ** 2) / 2) / adjusted_n, 0, 1)
+    margin_of_error = z_score * np.sqrt(adjusted_p * (1 - adjusted_p) / adjusted_n)
+
+    lower_bound = np.maximum(0, adjusted_p - margin_of_error)
+    upper_bound = np.minimum(1, adjusted_p + margin_of_error)
+
+    return lower_bound, upper_bound
+
+
+class BetaBinomialPosterior:
+    """
+    Conjugate Beta(alpha, beta) posterior for the probability of success of one or many independent binomial streams.
+    Each batch of (successes, trials) is folded in with alpha += successes and beta += trials - successes, so an
+    update costs O(1) per stream no matter how long the history is. The state of all streams is held in arrays and
+    the credible intervals are cached until the next update, so repeated refreshes without new data are free.
+
+    Attributes:
+        alpha (ndarray): The first shape parameter of the posterior of each stream.
+        beta (ndarray): The second shape parameter of the posterior of each stream.
+    """
+
+    def __init__(self, n_streams=None, prior_alpha=1.0, prior_beta=1.0):
+        """
+        Initializes the posterior of every stream to the Beta(prior_alpha, prior_beta) prior.
+
+        :param n_streams: (int, optional) The number of independent streams. If not provided, a single stream is
+                          tracked and the results are scalars.
+        :param prior_alpha: (float, optional) The first shape parameter of the prior (default is 1, uniform prior)
+        :param prior_beta: (float, optional) The second shape parameter of the prior (default is 1, uniform prior)
+        """
+        if prior_alpha <= 0 or prior_beta <= 0:
+            raise ValueError("prior_alpha and prior_beta must be positive.")
+        if n_streams is not None and (not isinstance(n_streams, int) or n_streams < 1):
+            raise ValueError("n_streams must be a positive integer.")
+
+        shape = () if n_streams is None else (n_streams,)
+        self.alpha = np.full(shape, float(prior_alpha))
+        self.beta = np.full(shape, float(prior_beta))
+        self._interval_cache = {}
+
+    def update(self, successes, trials, streams=None):
+        """
+        Fold a batch of observations into the posterior.
+
+        :param successes: (int or array_like) The number of successes in the batch for each stream
+        :param trials: (int or array_like) The number of trials in the batch for each stream
+        :param streams: (array_like, optional) The indices of the streams the counts belong to. If not provided, the
+                        counts must cover every stream.
+
+        :return: (BetaBinomialPosterior) The updated posterior
+        """
+        successes, trials = validate_count_arrays(successes, trials)
+        failures = trials - successes
+
+        if streams is None:
+            if np.broadcast_shapes(successes.shape, self.alpha.shape) != self.alpha.shape:
+                raise ValueError("successes and trials must match the number of streams.")
+            self.alpha += successes
+            self.beta += failures
+        else:
+            np.add.at(self.alpha, streams, successes)
+            np.add.at(self.beta, streams, failures)
+
+        self._interval_cache.clear()
+        return self
+
+    @property
+    def mean(self):
+        """
+        The posterior mean of the probability of success of each stream.
+
+        :return: (float or ndarray) The posterior mean(s)
+        """
+        return self.alpha / (self.alpha + self.beta)
+
+    def credible_interval(self, credible_level=0.95):
+        """
+        Calculate the equal-tailed credible interval of the probability of success of each stream. The result is
+        cached per credible level until the next update.
+
+        :param credible_level: (float, optional) The desired credible level (default is 0.95)
+
+        :return: (tuple) A tuple containing the lower and upper bounds of the credible interval(s)
+        """
+        if not 0 < credible_level < 1:
+            raise ValueError("Credible level must be between 0 and 1.")
+
+        if credible_level not in self._interval_cache:
+            tail = (1 - credible_level) / 2
+            self._interval_cache[credible_level] = (beta_ppf(tail, self.alpha, self.beta),
+                                                    beta_ppf(1 - tail, self.alpha, self.beta))
+        return self._interval_cache[credible_level]
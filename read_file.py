@@ -1,4 +1,5 @@
 import csv
+from collections import Counter
 from descriptive_statistics import *
 from Probability import *
 import numpy as np
@@ -37,3 +38,42 @@ def read_data_csv(filename):
             select_codes.append(select_code)
     
     return select_codes
+
+
+def read_contingency_table(filename, row_column, column_column):
+    """Builds an r x c contingency table of two categorical columns of a
+    CSV file in a single streaming pass. Only the count of each distinct
+    pair of values is kept, so memory depends on the number of categories,
+    not on the number of rows.
+
+    Args:
+        filename (str): Name of the CSV file to read from.
+        row_column (str): Name of the column whose values label the rows.
+        column_column (str): Name of the column whose values label the columns.
+
+    Returns:
+        tuple: The sorted row labels (list[str]), the sorted column labels
+        (list[str]) and the table of counts (ndarray of int64).
+    """
+
+    # utf-8-sig strips the byte order mark that spreadsheet exports put
+    # in front of the first header.
+    with open(filename, newline='', encoding='utf-8-sig') as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader)
+        if row_column not in header or column_column not in header:
+            raise ValueError("row_column and column_column must be columns of the CSV file.")
+        row_index = header.index(row_column)
+        column_index = header.index(column_column)
+        pair_counts = Counter((row[row_index], row[column_index]) for row in reader if row)
+
+    row_labels = sorted({row for row, _ in pair_counts})
+    column_labels = sorted({column for _, column in pair_counts})
+    row_positions = {label: i for i, label in enumerate(row_labels)}
+    column_positions = {label: j for j, label in enumerate(column_labels)}
+
+    table = np.zeros((len(row_labels), len(column_labels)), dtype=np.int64)
+    for (row, column), count in pair_counts.items():
+        table[row_positions[row], column_positions[column]] = count
+
+    return row_labels, column_labels, table
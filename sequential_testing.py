@@ -0,0 +1,118 @@
+import numpy as np
+from hypothesis_testing import validate_count_arrays
+
+
+class SequentialABMonitor:
+    """
+    Sequential A/B test of the difference of two binomial proportions that can be checked after every batch of
+    events. It uses the mixture sequential probability ratio test (mSPRT) with a normal mixing distribution over the
+    difference p_b - p_a. Its always-valid p-value is the running minimum of 1 / likelihood ratio, so stopping as soon
+    as it drops below alpha keeps the type I error at alpha no matter how often the experiment is looked at.
+
+    The monitor only keeps running counters per arm and experiment. An update adds the new counts and refreshes the
+    statistic of the touched experiments, so it costs O(1) per experiment regardless of the history. Many
+    experiments are tracked side by side in the same arrays.
+
+    Attributes:
+        successes_a (ndarray): The number of successes in arm A of each experiment.
+        trials_a (ndarray): The number of trials in arm A of each experiment.
+        successes_b (ndarray): The number of successes in arm B of each experiment.
+        trials_b (ndarray): The number of trials in arm B of each experiment.
+        p_values (ndarray): The always-valid p-value of each experiment.
+    """
+
+    def __init__(self, n_experiments=None, alpha=0.05, mixture_variance=1e-4):
+        """
+        Initializes the counters of every experiment to zero and the always-valid p-values to 1.
+
+        :param n_experiments: (int, optional) The number of experiments. If not provided, a single experiment is
+                              tracked and the results are scalars.
+        :param alpha: (float, optional) The significance level of the test (default is 0.05)
+        :param mixture_variance: (float, optional) The variance of the normal mixing distribution over p_b - p_a,
+                                 about the square of the effect size expected (default is 1e-4)
+        """
+        if not 0 < alpha < 1:
+            raise ValueError("alpha must be between 0 and 1.")
+        if mixture_variance <= 0:
+            raise ValueError("mixture_variance must be positive.")
+        if n_experiments is not None and (not isinstance(n_experiments, int) or n_experiments < 1):
+            raise ValueError("n_experiments must be a positive integer.")
+
+        shape = () if n_experiments is None else (n_experiments,)
+        self.alpha = alpha
+        self.mixture_variance = float(mixture_variance)
+        self.successes_a = np.zeros(shape, dtype=np.int64)
+        self.trials_a = np.zeros(shape, dtype=np.int64)
+        self.successes_b = np.zeros(shape, dtype=np.int64)
+        self.trials_b = np.zeros(shape, dtype=np.int64)
+        self.p_values = np.ones(shape)
+
+    def update(self, successes_a, trials_a, successes_b, trials_b, experiments=None):
+        """
+        Add a batch of events to the counters and refresh the always-valid p-values of the experiments it touches.
+
+        :param successes_a: (int or array_like) The number of new successes in arm A
+        :param trials_a: (int or array_like) The number of new trials in arm A
+        :param successes_b: (int or array_like) The number of new successes in arm B
+        :param trials_b: (int or array_like) The number of new trials in arm B
+        :param experiments: (array_like, optional) The indices of the experiments the counts belong to. If not
+                            provided, the counts must cover every experiment.
+
+        :return: (SequentialABMonitor) The updated monitor
+        """
+        successes_a, trials_a = validate_count_arrays(successes_a, trials_a)
+        successes_b, trials_b = validate_count_arrays(successes_b, trials_b)
+
+        if experiments is None:
+            if np.broadcast_shapes(successes_a.shape, successes_b.shape, self.p_values.shape) != self.p_values.shape:
+                raise ValueError("The counts must match the number of experiments.")
+            self.successes_a += successes_a
+            self.trials_a += trials_a
+            self.successes_b += successes_b
+            self.trials_b += trials_b
+            touched = ...
+        else:
+            touched = np.asarray(experiments)
+            np.add.at(self.successes_a, touched, successes_a)
+            np.add.at(self.trials_a, touched, trials_a)
+            np.add.at(self.successes_b, touched, successes_b)
+            np.add.at(self.trials_b, touched, trials_b)
+
+        inverse_likelihood_ratio = self._inverse_likelihood_ratio(self.successes_a[touched], self.trials_a[touched],
+                                                                  self.successes_b[touched], self.trials_b[touched])
+        self.p_values[touched] = np.fmin(self.p_values[touched], inverse_likelihood_ratio)
+        return self
+
+    def _inverse_likelihood_ratio(self, successes_a, trials_a, successes_b, trials_b):
+        """
+        1 / mSPRT likelihood ratio under the normal approximation, computed in log space to avoid overflow. NaN where
+        the variance of the difference is still zero (no trials in an arm, or only successes or only failures).
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p_a = successes_a / trials_a
+            p_b = successes_b / trials_b
+            variance = p_a * (1 - p_a) / trials_a + p_b * (1 - p_b) / trials_b
+            total_variance = variance + self.mixture_variance
+            log_likelihood_ratio = (0.5 * np.log(variance / total_variance) +
+                                    self.mixture_variance * (p_b - p_a) ** 2 / (2 * variance * total_variance))
+            return np.where(variance > 0, np.minimum(np.exp(-log_likelihood_ratio), 1.0), np.nan)
+
+    @property
+    def difference(self):
+        """
+        The observed difference p_b - p_a of each experiment, NaN where an arm has no trials yet.
+
+        :return: (float or ndarray) The observed difference(s)
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.successes_b / self.trials_b - self.successes_a / self.trials_a
+
+    @property
+    def rejected(self):
+        """
+        Whether the null hypothesis p_a = p_b has been rejected for each experiment. A rejection is final, since the
+        always-valid p-value never increases.
+
+        :return: (bool or ndarray) The decision(s)
+        """
+        return self.p_values <= self.alpha
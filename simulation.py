@@ -1,7 +1,155 @@
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
 import matplotlib.pyplot as plt
 import seaborn as sns
 from hypothesis_testing import proportion_z_test, fishers_exact_test, chi_square_test
+from parameter_estimation import SufficientStatistics
+
+
+# The number of results processed at a time by the chunked loops, which keeps their int64 and float64 temporaries
+# bounded no matter how many experiments are simulated.
+_CHUNK_SIZE = 2 ** 20
+
+# The largest number of histogram bins (cells * (max(n_trials) + 1)) simulate_parameter_sweep keeps, 1 GB of int64.
+_MAX_SWEEP_HISTOGRAM_BINS = 2 ** 27
+
+
+def _result_dtype(n_trials, dtype=None):
+    """Returns the dtype used to store results bounded by n_trials: the requested one after checking that it can hold
+    n_trials, or else the smallest unsigned integer type that can.
+
+    :param: n_trials (int): The largest possible result. An integral float such as 100.0 is accepted.
+    :param: dtype (data-type, optional): The requested dtype.
+
+    :return:
+            dtype: The dtype of the results.
+    """
+    # np.min_scalar_type of a float would be a float type that silently rounds large counts.
+    if n_trials != int(n_trials):
+        raise ValueError("n_trials must be a non-negative integer.")
+    n_trials = int(n_trials)
+
+    if dtype is None:
+        return np.min_scalar_type(n_trials)
+
+    dtype = np.dtype(dtype)
+    if dtype.kind not in 'iu' or np.iinfo(dtype).max < n_trials:
+        raise ValueError("dtype must be an integer type that can hold n_trials.")
+    return dtype
+
+
+def _bincount(data, minlength=0):
+    """np.bincount in chunks, so that compact unsigned results are not copied to intp all at once.
+
+    :param: data (ndarray): Non-negative integer data.
+    :param: minlength (int, optional): The minimum number of bins.
+
+    :return:
+            ndarray: The number of occurrences of each value.
+    """
+    histogram = np.zeros(minlength, dtype=np.int64)
+    for start in range(0, data.size, _CHUNK_SIZE):
+        chunk_histogram = np.bincount(data[start:start + _CHUNK_SIZE], minlength=histogram.size)
+        if chunk_histogram.size > histogram.size:
+            chunk_histogram[:histogram.size] += histogram
+            histogram = chunk_histogram
+        else:
+            histogram += chunk_histogram
+    return histogram
+
+
+def _draw_results(binomial, n_trials, p_success, out):
+    """Fills out with binomial draws in chunks, so the int64 draws never exist for all experiments at once.
+
+    :param: binomial (callable): np.random.binomial or the binomial method of a Generator.
+    :param: n_trials (int): The number of trials per experiment.
+    :param: p_success (float): The probability of success per trial.
+    :param: out (ndarray): The array receiving the results.
+
+    :return:
+            None
+    """
+    for start in range(0, out.size, _CHUNK_SIZE):
+        size = min(_CHUNK_SIZE, out.size - start)
+        out[start:start + size] = binomial(n_trials, p_success, size=size)
+
+
+def _draw_statistics(binomial, n_trials, p_success, n_experiments, chunk_size):
+    """Draws n_experiments results chunk_size at a time and keeps only their sufficient statistics.
+
+    :param: binomial (callable): np.random.binomial or the binomial method of a Generator.
+    :param: n_trials (int): The number of trials per experiment.
+    :param: p_success (float): The probability of success per trial.
+    :param: n_experiments (int): The number of experiments to simulate.
+    :param: chunk_size (int): The number of experiments drawn at a time.
+
+    :return:
+            SufficientStatistics: The histogram and moments of the results.
+    """
+    statistics = SufficientStatistics()
+    for start in range(0, n_experiments, chunk_size):
+        statistics.update(binomial(n_trials, p_success, size=min(chunk_size, n_experiments - start)))
+    return statistics
+
+
+def _simulate_part(task):
+    """Simulates the experiments start..stop of a parallel run with the worker's own Generator. Module level so that
+    it can be sent to worker processes. The results are written into the shared memory block of the whole run, or
+    with chunk_size only their sufficient statistics are returned.
+
+    :param: task (tuple): The shared memory name, dtype and length of the results, the range of experiments, n_trials,
+            p_success, the worker's SeedSequence and chunk_size.
+
+    :return:
+            SufficientStatistics: The statistics of the part when chunk_size is given, otherwise None.
+    """
+    memory_name, dtype, n_experiments, start, stop, n_trials, p_success, seed_sequence, chunk_size = task
+    generator = np.random.default_rng(seed_sequence)
+
+    if chunk_size is not None:
+        return _draw_statistics(generator.binomial, n_trials, p_success, stop - start, chunk_size)
+
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        results = np.ndarray(n_experiments, dtype=dtype, buffer=memory.buf)
+        _draw_results(generator.binomial, n_trials, p_success, results[start:stop])
+        del results
+    finally:
+        memory.close()
+    return None
+
+
+def _metrics_from_histogram(histogram):
+    """Calculates the mean, median and standard deviation of data summarised by its histogram over the values
+    0, 1, ..., histogram.shape[-1] - 1, in O(histogram.size). A 2-D histogram holds one histogram per row, and the
+    metrics of every row are calculated at once.
+
+    :param: histogram (ndarray): The number of observations of each value, along the last axis.
+
+    :return:
+            dict: A dictionary containing the mean, median, and standard deviation (NaN for empty histograms).
+    """
+    histogram = np.asarray(histogram)
+    values = np.arange(histogram.shape[-1])
+    count = histogram.sum(axis=-1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = histogram @ values / count
+        std_dev = np.sqrt(np.sum((values - mean[..., None]) ** 2 * histogram, axis=-1) / count)
+
+    # The median is the average of the two middle order statistics, the first values whose cumulative count passes
+    # their (0-based) ranks.
+    cumulative = np.cumsum(histogram, axis=-1)
+    lower = np.sum(cumulative <= ((count - 1) // 2)[..., None], axis=-1)
+    upper = np.sum(cumulative <= (count // 2)[..., None], axis=-1)
+    median = np.where(count > 0, (lower + upper) / 2, np.nan)
+
+    return {
+        'mean': mean,
+        'median': median[()],
+        'std_dev': std_dev
+    }
 
 
 class BinomialSimulation:
@@ -13,15 +161,18 @@ class BinomialSimulation:
         p_success (float): The probability of success in each trial.
         n_experiments (int): The number of experiments to simulate.
         results (ndarray or None): An array containing the results of the simulations, or None if the simulation has
-        not been run.
+        not been run or was run in chunks.
+        statistics (SufficientStatistics or None): The running histogram and moments of the results, kept instead of
+        the results when the simulation is run in chunks.
 
     Methods:
-       - run_simulation(): Runs the binomial simulation.
+       - run_simulation(chunk_size=None, dtype=None, n_workers=1, seed=None): Runs the binomial simulation,
+         optionally in chunks and in parallel.
        - plot_histogram(bins=None): Plots a histogram of the simulation results.
        - plot_success_probability_evolution(window_size=10): Plots the evolution of success probabilities.
        - perform_hypothesis_testing(test_type, **kwargs): Performs hypothesis testing on the simulated results.
-       - cross_validate_hypothesis_testing(test_type, n_folds=5, **kwargs): Performs cross-validation of hypothesis
-         testing on the simulated results.
+       - cross_validate_hypothesis_testing(test_type, n_folds=5, n_workers=1, **kwargs): Performs cross-validation of
+         hypothesis testing on the simulated results.
     """
 
     def __init__(self, n_trials, p_success, n_experiments):
@@ -31,20 +182,120 @@ class BinomialSimulation:
         :param: p_success (float): The probability of success per trial.
         :param: n_experiments (int): The number of experiments to simulate.
         """
-        if n_trials < 0:
+        if n_trials < 0 or n_trials != int(n_trials):
             raise ValueError("n_trials must be a non-negative integer.")
         if p_success < 0 or p_success > 1:
             raise ValueError("p_success must be a float between 0 and 1 (inclusive).")
         if n_experiments < 0:
             raise ValueError("n_trials must be a non-negative integer.")
 
-        self.n_trials = n_trials
+        # An integral float such as 100.0 is stored as an int, since it sizes the histograms and the results dtype.
+        self.n_trials = int(n_trials)
         self.p_success = p_success
         self.n_experiments = n_experiments
         self.results = None
+        self.statistics = None
+
+    def run_simulation(self, chunk_size=None, dtype=None, n_workers=1, seed=None):
+        """Runs the binomial simulation. By default every result is stored in self.results, using the smallest
+        unsigned integer type that can hold n_trials (uint8 up to 255 trials, uint16 up to 65535, ...) or the
+        requested dtype. With chunk_size, the experiments are drawn chunk_size at a time and only a running histogram
+        over 0..n_trials and the running moments are kept in self.statistics, so memory is O(n_trials) instead of
+        O(n_experiments). The histogram based methods (plot_histogram, calculate_metrics,
+        get_results(as_histogram=True)) work in both modes.
+
+        With a seed or several workers, the experiments are split into n_workers contiguous parts, each drawn by its
+        own Generator spawned from np.random.SeedSequence(seed), so the results only depend on the seed and n_workers.
+        The parts are simulated in a process pool that writes into one shared memory block, or merges the statistics
+        of the parts in chunks. Without either, the global np.random state is used as before.
+
+        :param: chunk_size (int, optional): The number of experiments drawn at a time. If not provided, all results
+                are stored.
+        :param: dtype (data-type, optional): The integer dtype of the stored results. It must be able to hold
+                n_trials.
+        :param: n_workers (int, optional): The number of worker processes to split the experiments over (1 default).
+        :param: seed (int, optional): A seed value for the random number generators, if reproducibility is desired.
+
+        :return:
+                None
+        """
+        dtype = _result_dtype(self.n_trials, dtype)
+        if chunk_size is not None and (not isinstance(chunk_size, int) or chunk_size < 1):
+            raise ValueError("chunk_size must be a positive integer.")
+        if not isinstance(n_workers, int) or n_workers < 1:
+            raise ValueError("n_workers must be a positive integer.")
+
+        if seed is None and n_workers == 1:
+            if chunk_size is None:
+                self.results = np.empty(self.n_experiments, dtype=dtype)
+                _draw_results(np.random.binomial, self.n_trials, self.p_success, self.results)
+                self.statistics = None
+            else:
+                self.results = None
+                self.statistics = _draw_statistics(np.random.binomial, self.n_trials, self.p_success,
+                                                   self.n_experiments, chunk_size)
+            return
+
+        bounds = np.linspace(0, self.n_experiments, n_workers + 1).astype(np.int64)
+        seed_sequences = np.random.SeedSequence(seed).spawn(n_workers)
+
+        if chunk_size is not None:
+            tasks = [(None, dtype, self.n_experiments, bounds[i], bounds[i + 1], self.n_trials, self.p_success,
+                      seed_sequences[i], chunk_size) for i in range(n_workers)]
+            if n_workers > 1:
+                with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                    parts = list(executor.map(_simulate_part, tasks))
+            else:
+                parts = [_simulate_part(tasks[0])]
+            statistics = SufficientStatistics()
+            for part in parts:
+                statistics.merge(part)
+            self.results = None
+            self.statistics = statistics
+            return
+
+        if n_workers == 1 or self.n_experiments == 0:
+            self.results = np.empty(self.n_experiments, dtype=dtype)
+            for i in range(n_workers):
+                _draw_results(np.random.default_rng(seed_sequences[i]).binomial, self.n_trials, self.p_success,
+                              self.results[bounds[i]:bounds[i + 1]])
+            self.statistics = None
+            return
+
+        memory = shared_memory.SharedMemory(create=True, size=self.n_experiments * dtype.itemsize)
+        try:
+            tasks = [(memory.name, dtype, self.n_experiments, bounds[i], bounds[i + 1], self.n_trials, self.p_success,
+                      seed_sequences[i], None) for i in range(n_workers)]
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                list(executor.map(_simulate_part, tasks))
+            # Copied out once, so that the results do not depend on the lifetime of the shared block.
+            shared_results = np.ndarray(self.n_experiments, dtype=dtype, buffer=memory.buf)
+            self.results = shared_results.copy()
+            del shared_results
+        finally:
+            memory.close()
+            memory.unlink()
+        self.statistics = None
+
+    def _check_simulated(self):
+        if self.results is None and self.statistics is None:
+            raise ValueError("Simulation has not been run. Call 'run_simulation()' first.")
+
+    def _check_results(self):
+        if self.results is None and self.statistics is not None:
+            raise ValueError("The simulation was run in chunks and kept only the histogram. Call 'run_simulation()' "
+                             "without chunk_size to keep the individual results.")
+        self._check_simulated()
+
+    def _histogram(self):
+        """Returns the number of experiments with each number of successes 0, 1, ..., n_trials."""
+        self._check_simulated()
+        if self.results is not None:
+            return _bincount(self.results, minlength=self.n_trials + 1)
 
-    def run_simulation(self):
-        self.results = np.random.binomial(self.n_trials, self.p_success, size=self.n_experiments)
+        histogram = np.zeros(self.n_trials + 1, dtype=np.int64)
+        histogram[:self.statistics.histogram.size] = self.statistics.histogram
+        return histogram
 
     def plot_histogram(self, bins=None):
         """Plots a histogram of the results.
@@ -57,11 +308,14 @@ class BinomialSimulation:
         :return:
                 None
         """
-        if self.results is None:
-            raise ValueError("Simulation has not been run. Call 'run_simulation()' first.")
+        self._check_simulated()
 
         plt.figure()
-        sns.histplot(self.results, kde=False, bins=bins, discrete=True)
+        if self.results is not None:
+            sns.histplot(self.results, kde=False, bins=bins, discrete=True)
+        else:
+            sns.histplot(x=np.arange(self.n_trials + 1), weights=self._histogram(), kde=False, bins=bins,
+                         discrete=True)
         plt.axvline(self.n_trials * self.p_success, color='r', linestyle='dashed', linewidth=1)
         plt.title("Histogram of Successes in Binomial Experiments")
         plt.xlabel("Number of Successes")
@@ -77,11 +331,16 @@ class BinomialSimulation:
         :return:
                 None
     """
-        if self.results is None:
-            raise ValueError("Simulation has not been run. Call 'run_simulation()' first.")
+        self._check_results()
 
-        success_probabilities = self.results / self.n_trials
-        moving_average = np.convolve(success_probabilities, np.ones(window_size), 'valid') / window_size
+        # Moving sums from an int64 running sum, built chunk by chunk so that the compact results are never upcast
+        # as a whole; only the plotted series itself is float64.
+        moving_average = np.empty(max(len(self.results) - window_size + 1, 0))
+        for start in range(0, moving_average.size, _CHUNK_SIZE):
+            segment = self.results[start:start + _CHUNK_SIZE + window_size - 1]
+            running_sum = np.concatenate(([0], np.cumsum(segment, dtype=np.int64)))
+            window_sums = running_sum[window_size:] - running_sum[:-window_size]
+            moving_average[start:start + window_sums.size] = window_sums / (window_size * self.n_trials)
 
         plt.figure()
         plt.plot(moving_average)
@@ -110,8 +369,7 @@ class BinomialSimulation:
                 float: The p-value resulting from the hypothesis test.
         """
 
-        if self.results is None:
-            raise ValueError("Simulation has not been run. Call 'run_simulation()' first.")
+        self._check_simulated()
 
         if test_type == 'proportion_z_test':
             if 'successes1' not in kwargs or 'trials1' not in kwargs or 'successes2' not in kwargs or 'trials2' not in \
@@ -138,14 +396,21 @@ class BinomialSimulation:
 
         return p_value
 
-    def calculate_metrics(self, test_data):
+    def calculate_metrics(self, test_data=None):
         """Calculates various metrics for the binomial experiment
 
-        :param: test_data (list): A list of results for the test data.
+        :param: test_data (list, optional): A list of results for the test data. If not provided, the metrics of all
+                simulated experiments are calculated from their histogram, which also works when the simulation was run
+                in chunks.
 
         :return:
                 dict: A dictionary containing the mean, median, and standard deviation.
         """
+        if test_data is None:
+            return _metrics_from_histogram(self._histogram())
+        if isinstance(test_data, np.ndarray) and test_data.dtype.kind == 'u':
+            # Compact results are summarised through their histogram instead of float64 temporaries of the data.
+            return _metrics_from_histogram(_bincount(test_data, minlength=self.n_trials + 1))
 
         mean = np.mean(test_data)
         median = np.median(test_data)
@@ -157,7 +422,7 @@ class BinomialSimulation:
             'std_dev': std_dev
         }
 
-    def cross_validate_hypothesis_testing(self, test_type, n_folds=5, **kwargs):
+    def cross_validate_hypothesis_testing(self, test_type, n_folds=5, n_workers=1, **kwargs):
         """Performs cross-validation of hypothesis testing on the simulated results using the specified test type and
             input values provided in the kwargs. The input values required depend on the test type being used, and should
             be provided in the kwargs dictionary.
@@ -172,43 +437,185 @@ class BinomialSimulation:
         :param: test_type (str): The type of hypothesis test to perform ('proportion_z_test', 'fishers_exact_test', or
             'chi_square_test').
         :param: n_folds (int, optional): The number of folds to use for cross-validation (5 default)
+        :param: n_workers (int, optional): The number of threads the folds are evaluated in (1 default). The threads
+            share the results, so no fold is copied.
         :param: **kwargs: Additional keyword arguments to pass to the cross validate hypothesis test function.
 
         :return:
             dict: A dictionary containing the average performance metrics across all folds.
         """
-        if self.results is None:
-            raise ValueError("Simulation has not been run. Call 'run_simulation()' first.")
+        self._check_results()
 
         if n_folds < 2:
             raise ValueError("n_folds must be greater than or equal to 2.")
+        if not isinstance(n_workers, int) or n_workers < 1:
+            raise ValueError("n_workers must be a positive integer.")
+        if len(self.results) < n_folds:
+            raise ValueError("n_folds must not exceed the number of experiments.")
+
+        # The folds are views of the results with np.linspace boundaries, so the remainder is spread over the folds
+        # instead of dropped and nothing is copied. The training data of a fold is the rest of the results, which the
+        # metrics do not need.
+        bounds = np.linspace(0, len(self.results), n_folds + 1).astype(np.int64)
+        folds = [self.results[bounds[i]:bounds[i + 1]] for i in range(n_folds)]
+
+        def fold_histogram(fold):
+            return _bincount(fold, minlength=self.n_trials + 1)
+
+        if n_workers > 1:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                histograms = list(executor.map(fold_histogram, folds))
+        else:
+            histograms = [fold_histogram(fold) for fold in folds]
 
-        # Split the data into n_folds
-        fold_size = len(self.results) // n_folds
-        folds = [self.results[i:i + fold_size] for i in range(0, len(self.results), fold_size)]
-
-        metrics_list = []
+        # Evaluate the metrics of every test fold at once and average them
+        width = max(histogram.size for histogram in histograms)
+        histograms = np.stack([np.pad(histogram, (0, width - histogram.size)) for histogram in histograms])
+        metrics = _metrics_from_histogram(histograms)
 
-        # Perform hypothesis testing on each fold
-        for i in range(n_folds):
-            test_data = folds[i]
-            train_data = [sample for fold in folds[:i] + folds[i + 1:] for sample in fold]
+        return {key: np.mean(value) for key, value in metrics.items()}
 
-            # Perform hypothesis testing using the train_data and kwargs
+    def get_results(self, as_histogram=False):
+        """Returns the results of the simulation.
 
-            # Evaluate metrics on the test_data
-            metrics = self.calculate_metrics(test_data)
-            metrics_list.append(metrics)
+        :param: as_histogram (bool, optional): Whether to return the number of experiments with each number of
+                successes 0, 1, ..., n_trials instead of the individual results (False by default). Required when the
+                simulation was run in chunks.
 
-        # Calculate average metrics
-        avg_metrics = {key: sum([fold[key] for fold in metrics_list]) / n_folds for key in
-                       metrics_list[0].keys()}
+        :return:
+                ndarray: The results of the simulations, or their histogram
+        """
+        if as_histogram:
+            return self._histogram()
+        self._check_results()
+        return self.results
 
-        return avg_metrics
 
-    def get_results(self):
-        if self.results is None:
-            raise ValueError("Simulation has not been run. Call 'run_simulation()' first.")
-        return self.results
+def _sweep_part(task):
+    """Simulates the experiments of a contiguous range of grid cells with the part's own Generator. Module level so
+    that it can be sent to worker processes. The cells are drawn in blocks, one broadcast call per block and chunk of
+    experiments, so that the draws and the bincount of each step stay around _CHUNK_SIZE values. The blocks are the
+    same whether the results or only the histograms are kept, so both see the same draws.
 
+    :param: task (tuple): n_trials and p_success of the cells (1-D), n_experiments, whether to keep only the
+            histograms, the dtype of the results, the histogram width and the part's SeedSequence.
 
+    :return:
+            ndarray: The results of the cells, of shape (cells, n_experiments), or their histograms, of shape
+            (cells, width).
+    """
+    n_trials, p_success, n_experiments, as_histogram, dtype, width, seed_sequence = task
+    generator = np.random.default_rng(seed_sequence)
+    n_cells = n_trials.size
+
+    if as_histogram:
+        output = np.zeros((n_cells, width), dtype=np.int64)
+    else:
+        output = np.empty((n_cells, n_experiments), dtype=dtype)
+
+    block_cells = max(1, _CHUNK_SIZE // width)
+    for block_start in range(0, n_cells, block_cells):
+        block = slice(block_start, min(block_start + block_cells, n_cells))
+        block_trials = n_trials[block, None]
+        block_p_success = p_success[block, None]
+        size = block_trials.shape[0]
+        offsets = np.arange(size)[:, None] * width
+        step = max(1, _CHUNK_SIZE // size)
+
+        for start in range(0, n_experiments, step):
+            stop = min(start + step, n_experiments)
+            draws = generator.binomial(block_trials, block_p_success, size=(size, stop - start))
+            if as_histogram:
+                # One bincount for the block, with the values of each cell shifted into its own row.
+                output[block] += np.bincount((draws + offsets).ravel(), minlength=size * width).reshape(size, width)
+            else:
+                output[block, start:stop] = draws
+
+    return output
+
+
+def _metrics_from_results(results):
+    """Calculates the mean, median and standard deviation along the last axis of the results, a block of rows at a
+    time so that the float64 and sorting temporaries stay around _CHUNK_SIZE values.
+
+    :param: results (ndarray): The results, with the experiments of each row along the last axis.
+
+    :return:
+            dict: A dictionary containing the mean, median, and standard deviation of each row (NaN without
+            experiments).
+    """
+    shape = results.shape[:-1]
+    metrics = {key: np.full(shape, np.nan) for key in ['mean', 'median', 'std_dev']}
+    if results.shape[-1] == 0:
+        return {key: value[()] for key, value in metrics.items()}
+
+    rows = results.reshape(-1, results.shape[-1])
+    flat_metrics = {key: value.reshape(-1) for key, value in metrics.items()}
+    block_rows = max(1, _CHUNK_SIZE // results.shape[-1])
+    for start in range(0, rows.shape[0], block_rows):
+        block = rows[start:start + block_rows]
+        flat_metrics['mean'][start:start + block_rows] = np.mean(block, axis=-1)
+        flat_metrics['median'][start:start + block_rows] = np.median(block, axis=-1)
+        flat_metrics['std_dev'][start:start + block_rows] = np.std(block, axis=-1)
+    return {key: value[()] for key, value in metrics.items()}
+
+
+def simulate_parameter_sweep(n_trials, p_success, n_experiments, as_histogram=False, n_workers=1, seed=None):
+    """Simulates n_experiments binomial experiments for every cell of a grid of parameters at once, instead of one
+    BinomialSimulation per cell. n_trials and p_success are broadcast against each other like NumPy arrays: two
+    1-D arrays of the same length are a list of cells, and n_trials[:, None] with p_success[None, :] is their full
+    grid. The cells are split into n_workers contiguous parts, each drawn by its own Generator spawned from
+    np.random.SeedSequence(seed) in a process pool, so the results only depend on the seed and n_workers.
+
+    The histograms share one width, max(n_trials) + 1, so they take 8 * cells * (max(n_trials) + 1) bytes; grids
+    whose histograms would exceed _MAX_SWEEP_HISTOGRAM_BINS bins are rejected, and their results should be returned
+    instead.
+
+    :param: n_trials (int or array_like): The number of trials per experiment of each cell.
+    :param: p_success (float or array_like): The probability of success per trial of each cell.
+    :param: n_experiments (int): The number of experiments to simulate per cell.
+    :param: as_histogram (bool, optional): Whether to keep only the number of experiments of each cell with each
+            number of successes 0, 1, ..., max(n_trials) instead of the individual results (False by default).
+    :param: n_workers (int, optional): The number of worker processes to split the cells over (1 default).
+    :param: seed (int, optional): A seed value for the random number generators, if reproducibility is desired.
+
+    :return:
+            tuple: The results, of shape grid shape + (n_experiments,) in the smallest unsigned integer type that can
+            hold max(n_trials), or the histograms, of shape grid shape + (max(n_trials) + 1,), and a dictionary of
+            the mean, median and standard deviation of every cell, each an array of the grid shape.
+    """
+    n_trials, p_success = np.broadcast_arrays(np.asarray(n_trials), np.asarray(p_success, dtype=np.float64))
+    if n_trials.dtype.kind not in 'iu' or np.any(n_trials < 0):
+        raise ValueError("n_trials must contain non-negative integers.")
+    if np.any(p_success < 0) or np.any(p_success > 1):
+        raise ValueError("p_success must contain floats between 0 and 1 (inclusive).")
+    if not isinstance(n_experiments, int) or n_experiments < 0:
+        raise ValueError("n_experiments must be a non-negative integer.")
+    if not isinstance(n_workers, int) or n_workers < 1:
+        raise ValueError("n_workers must be a positive integer.")
+
+    shape = n_trials.shape
+    cell_trials = n_trials.ravel().astype(np.int64)
+    cell_p_success = p_success.ravel()
+    max_trials = int(cell_trials.max()) if cell_trials.size else 0
+    dtype = _result_dtype(max_trials)
+    if as_histogram and cell_trials.size * (max_trials + 1) > _MAX_SWEEP_HISTOGRAM_BINS:
+        raise ValueError("The histograms of this grid would exceed _MAX_SWEEP_HISTOGRAM_BINS bins. Return the results "
+                         "instead.")
+
+    bounds = np.linspace(0, cell_trials.size, n_workers + 1).astype(np.int64)
+    seed_sequences = np.random.SeedSequence(seed).spawn(n_workers)
+    tasks = [(cell_trials[bounds[i]:bounds[i + 1]], cell_p_success[bounds[i]:bounds[i + 1]], n_experiments,
+              as_histogram, dtype, max_trials + 1, seed_sequences[i]) for i in range(n_workers)]
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            parts = list(executor.map(_sweep_part, tasks))
+    else:
+        parts = [_sweep_part(tasks[0])]
+
+    if as_histogram:
+        histograms = np.concatenate(parts).reshape(shape + (max_trials + 1,))
+        return histograms, _metrics_from_histogram(histograms)
+
+    results = np.concatenate(parts).reshape(shape + (n_experiments,))
+    return results, _metrics_from_results(results)